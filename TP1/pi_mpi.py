@@ -1,38 +1,181 @@
 from mpi4py import MPI
+import numpy as np
 import random
 import time
-import sys
+import argparse
 
-comm = MPI.COMM_WORLD
-rank = comm.Get_rank()
-size = comm.Get_size()
+# Estimation de pi par Monte Carlo.
+#   - backend "numpy" : tirages par lots de taille fixe (BATCH) avec un
+#     générateur numpy ; la mémoire reste bornée même pour N de l'ordre du milliard.
+#   - backend "loop"  : version d'origine, un couple (x, y) à la fois avec random.uniform.
+# Chaque rang a son propre flux aléatoire, issu de SeedSequence(seed).spawn(size) :
+# les flux sont statistiquement indépendants et le tirage est reproductible
+# à partir de la graine affichée.
+#
+# Mode adaptatif (--tol) : au lieu de fixer N, on tire par tours de BATCH
+# échantillons par rang jusqu'à ce que l'erreur type globale passe sous la
+# tolérance. La réduction des sommes (Iallreduce non bloquant) est recouverte
+# par le calcul du lot suivant ; la décision d'arrêt est prise sur les sommes
+# réduites, identiques sur tous les rangs.
+BATCH = 1 << 20
 
-N = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000_00
 
-base = N // size
-rem = N % size
-localN = base + (1 if rank < rem else 0)
+def count_hits_loop(n, seed):
+    random.seed(seed)
+    hits = 0
+    for _ in range(n):
+        x = random.uniform(-1.0, 1.0)
+        y = random.uniform(-1.0, 1.0)
+        if x*x + y*y <= 1.0:
+            hits += 1
+    return hits
 
-random.seed(int(time.time()) + rank * 1234567)
 
-comm.Barrier()
-t0 = time.time()
+def count_hits_numpy(n, rng, batch=BATCH):
+    # Par symétrie, on tire dans le quart de disque [0,1)x[0,1)
+    x = np.empty(min(n, batch))
+    y = np.empty_like(x)
+    hits = 0
+    remaining = n
+    while remaining > 0:
+        m = min(batch, remaining)
+        xb, yb = x[:m], y[:m]
+        rng.random(out=xb)
+        rng.random(out=yb)
+        xb *= xb
+        yb *= yb
+        xb += yb
+        hits += int(np.count_nonzero(xb <= 1.0))
+        remaining -= m
+    return hits
 
-local_hits = 0
-for _ in range(localN):
-    x = random.uniform(-1.0, 1.0)
-    y = random.uniform(-1.0, 1.0)
-    if x*x + y*y <= 1.0:
-        local_hits += 1
 
-total_hits = comm.reduce(local_hits, op=MPI.SUM, root=0)
+def rank_streams(comm, seed=None):
+    """
+    Générateur numpy indépendant pour ce rang, et l'entropie de la graine
+    racine (identique sur tous les rangs) pour pouvoir rejouer le tirage.
+    """
+    if seed is None:
+        seed = np.random.SeedSequence().entropy if comm.Get_rank() == 0 else None
+        seed = comm.bcast(seed, root=0)
+    child = np.random.SeedSequence(seed).spawn(comm.Get_size())[comm.Get_rank()]
+    return np.random.default_rng(child), seed
 
-pi = None
-if rank == 0:
-    pi = 4.0 * total_hits / N
 
-pi = comm.bcast(pi, root=0)
+def standard_error(n, s1, s2):
+    """
+    Moyenne et erreur type de l'estimateur à partir de n, somme et somme des carrés.
+    """
+    mean = s1 / n
+    var = max(s2 / n - mean * mean, 0.0)
+    return mean, (var / n) ** 0.5
 
-t1 = time.time()
-if rank == 0:
-    print(f"mpi4py: N={N} hits={total_hits} pi≈{pi:.10f} time={t1-t0:.3f}s (np={size})")
+
+def adaptive_pi(comm, rng, tol, batch=BATCH, max_samples=None):
+    """
+    Tire des lots jusqu'à ce que l'erreur type globale soit < tol (ou que
+    max_samples tirages aient été faits au total). Chaque échantillon vaut 4
+    (dans le disque) ou 0 ; on accumule localement [n, somme, somme des carrés].
+    Renvoie (pi, erreur type, nombre total de tirages, tirages locaux, nombre de tours).
+    """
+    local = np.zeros(3)
+    reduced = np.zeros(3)
+    sent = None
+    req = None
+    rounds = 0
+    while True:
+        hits = count_hits_numpy(batch, rng, batch)
+        local += (batch, 4.0 * hits, 16.0 * hits)
+        rounds += 1
+        if req is not None:
+            # Sommes du tour précédent, réduites pendant le calcul du lot courant
+            req.Wait()
+            n = reduced[0]
+            _, err = standard_error(*reduced)
+            if err < tol or (max_samples is not None and n >= max_samples):
+                break
+        sent = local.copy()   # le tampon d'envoi ne doit pas changer avant Wait
+        req = comm.Iallreduce(sent, reduced, op=MPI.SUM)
+    # Bilan final incluant le dernier lot
+    comm.Allreduce(local, reduced, op=MPI.SUM)
+    pi, err = standard_error(*reduced)
+    return pi, err, int(reduced[0]), int(local[0]), rounds
+
+
+def main():
+    comm = MPI.COMM_WORLD
+    rank = comm.Get_rank()
+    size = comm.Get_size()
+
+    parser = argparse.ArgumentParser(description="Estimation de pi par Monte Carlo (MPI)")
+    parser.add_argument("N", nargs="?", type=int, default=10_000_00)
+    parser.add_argument("--backend", choices=("numpy", "loop"), default="numpy")
+    parser.add_argument("--seed", type=int, default=None, help="graine racine (tirage reproductible)")
+    parser.add_argument("--batch", type=int, default=BATCH, help="taille des lots de tirages")
+    parser.add_argument("--tol", type=float, default=None,
+                        help="mode adaptatif : erreur type visée (N est alors ignoré)")
+    parser.add_argument("--max-samples", type=int, default=None,
+                        help="mode adaptatif : nombre maximal de tirages au total")
+    parser.add_argument("--compare", action="store_true",
+                        help="mesurer aussi la boucle python d'origine et afficher le speedup")
+    args = parser.parse_args()
+    N = args.N
+
+    base = N // size
+    rem = N % size
+    localN = base + (1 if rank < rem else 0)
+
+    rng, seed = rank_streams(comm, args.seed)
+
+    if args.tol is not None:
+        comm.Barrier()
+        t0 = time.time()
+        pi, err, total, local_n, rounds = adaptive_pi(comm, rng, args.tol, args.batch, args.max_samples)
+        elapsed = time.time() - t0
+        rates = comm.gather(local_n / elapsed, root=0)
+        if rank == 0:
+            print(f"mpi4py (adaptatif): tol={args.tol:g} N={total} tours={rounds} "
+                  f"pi≈{pi:.10f} ± {err:.2e} time={elapsed:.3f}s (np={size}, seed={seed})")
+            for r, rate in enumerate(rates):
+                print(f"  rang {r}: {rate:.3e} tirages/s")
+        return
+
+    comm.Barrier()
+    t0 = time.time()
+
+    if args.backend == "numpy":
+        local_hits = count_hits_numpy(localN, rng, args.batch)
+    else:
+        local_hits = count_hits_loop(localN, int(rng.integers(2**63)))
+
+    total_hits = comm.reduce(local_hits, op=MPI.SUM, root=0)
+
+    pi = None
+    if rank == 0:
+        pi = 4.0 * total_hits / N
+
+    pi = comm.bcast(pi, root=0)
+
+    t1 = time.time()
+    if rank == 0:
+        print(f"mpi4py ({args.backend}): N={N} hits={total_hits} pi≈{pi:.10f} time={t1-t0:.3f}s "
+              f"(np={size}, seed={seed})")
+
+    if args.compare:
+        # Même nombre de tirages avec l'autre backend, pour le speedup
+        other = "loop" if args.backend == "numpy" else "numpy"
+        comm.Barrier()
+        t2 = time.time()
+        if other == "numpy":
+            count_hits_numpy(localN, rng, args.batch)
+        else:
+            count_hits_loop(localN, int(rng.integers(2**63)))
+        comm.Barrier()
+        t3 = time.time()
+        if rank == 0:
+            t_numpy, t_loop = (t1 - t0, t3 - t2) if other == "loop" else (t3 - t2, t1 - t0)
+            print(f"numpy: {t_numpy:.3f}s, boucle python: {t_loop:.3f}s, speedup {t_loop/t_numpy:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
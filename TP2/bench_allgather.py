@@ -0,0 +1,60 @@
+from mpi4py import MPI
+import numpy as np
+import argparse
+from time import time
+from matvec_kernel import split_rows
+
+# Coût du rassemblement de v en fonction de la taille du message :
+#   - allgather (minuscule) : chaque morceau est sérialisé (pickle), on obtient
+#     une liste de tableaux qu'il faut ensuite concaténer (np.concatenate) ;
+#   - Allgatherv : les morceaux sont reçus directement dans un v préalloué.
+# On prend le meilleur temps sur `reps` répétitions.
+#
+# Usage : mpirun -np 4 python bench_allgather.py [--max-exp 22] [--reps 20]
+
+
+def best_time(comm, fn, reps):
+    best = float("inf")
+    for _ in range(reps):
+        comm.Barrier()
+        t0 = time()
+        fn()
+        best = min(best, comm.allreduce(time() - t0, op=MPI.MAX))
+    return best
+
+
+def main():
+    comm = MPI.COMM_WORLD
+    rank = comm.Get_rank()
+    size = comm.Get_size()
+
+    parser = argparse.ArgumentParser(description="allgather (pickle) contre Allgatherv (tampons)")
+    parser.add_argument("--min-exp", type=int, default=4)
+    parser.add_argument("--max-exp", type=int, default=22)
+    parser.add_argument("--reps", type=int, default=20)
+    args = parser.parse_args()
+
+    if rank == 0:
+        print(f"np={size}")
+        print(f"{'N':>10s} {'octets':>12s} {'allgather+concat (s)':>22s} {'Allgatherv (s)':>16s} {'rapport':>8s}")
+    for e in range(args.min_exp, args.max_exp + 1):
+        N = 2**e + 1   # volontairement non divisible par size
+        counts, disp = split_rows(N, size)
+        v_local = np.full(counts[rank], float(rank))
+        v = np.empty(N)
+
+        def pickled():
+            return np.concatenate(comm.allgather(v_local))
+
+        def buffered():
+            comm.Allgatherv(v_local, [v, counts, disp, MPI.DOUBLE])
+
+        t_pickle = best_time(comm, pickled, args.reps)
+        t_buffer = best_time(comm, buffered, args.reps)
+        assert np.array_equal(v, pickled())
+        if rank == 0:
+            print(f"{N:>10d} {8*N:>12d} {t_pickle:>22.6f} {t_buffer:>16.6f} {t_pickle/t_buffer:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+# Mesure du gain apporté par la détection de cycle (MandelbrotSet.periodicity)
+# sur la fenêtre par défaut de mandelbrot.py.
+#
+# Usage : python bench_mandelbrot_periodicity.py [width height]
+import sys
+import numpy as np
+from time import time
+from mandelbrot_set import MandelbrotSet, compute_rows
+
+
+def main():
+    width, height = 1024, 1024
+    if len(sys.argv) > 2:
+        width, height = int(sys.argv[1]), int(sys.argv[2])
+
+    print(f"Image {width}x{height}, fenêtre par défaut de mandelbrot.py")
+    for max_iterations in (1000, 10000):
+        times = {}
+        images = {}
+        for periodicity in (False, True):
+            mset = MandelbrotSet(max_iterations=max_iterations, escape_radius=10.,
+                                 periodicity=periodicity)
+            deb = time()
+            images[periodicity] = compute_rows(mset, width, height, range(height))
+            times[periodicity] = time() - deb
+
+        ndiff = np.count_nonzero(images[False] != images[True])
+        print(f"max_iterations={max_iterations:6d} : "
+              f"sans détection {times[False]:.3f}s, avec détection {times[True]:.3f}s, "
+              f"speedup {times[False]/times[True]:.2f}x, pixels différents : {ndiff}")
+
+
+if __name__ == "__main__":
+    main()
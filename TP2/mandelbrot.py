@@ -1,68 +1,19 @@
 # Calcul de l'ensemble de Mandelbrot en python
-import numpy as np
-from dataclasses import dataclass
-from math import log
+#
+# Usage : python mandelbrot.py [max_iterations] [--output image.png|.npy|.raw] [--show]
 from time import time
-import matplotlib.cm
-import matplotlib.pyplot as plt
+from mandelbrot_set import MandelbrotSet, compute_rows
+from mandelbrot_output import render_parser, output_image
 
 
-@dataclass
-class MandelbrotSet:
-    max_iterations: int
-    escape_radius:  float = 2.0
-
-    def __contains__(self, c: complex) -> bool:
-        return self.stability(c) == 1
-
-    def convergence(self, c: complex, smooth=False, clamp=True) -> float:
-        value = self.count_iterations(c, smooth)/self.max_iterations
-        return max(0.0, min(value, 1.0)) if clamp else value
-
-    def count_iterations(self, c: complex,  smooth=False) -> int | float:
-        z:    complex
-        iter: int
-
-        # On vérifie dans un premier temps si le complexe
-        # n'appartient pas à une zone de convergence connue :
-        #   1. Appartenance aux disques  C0{(0,0),1/4} et C1{(-1,0),1/4}
-        if c.real*c.real+c.imag*c.imag < 0.0625:
-            return self.max_iterations
-        if (c.real+1)*(c.real+1)+c.imag*c.imag < 0.0625:
-            return self.max_iterations
-        #  2.  Appartenance à la cardioïde {(1/4,0),1/2(1-cos(theta))}
-        if (c.real > -0.75) and (c.real < 0.5):
-            ct = c.real-0.25 + 1.j * c.imag
-            ctnrm2 = abs(ct)
-            if ctnrm2 < 0.5*(1-ct.real/max(ctnrm2, 1.E-14)):
-                return self.max_iterations
-        z = 0
-        for iter in range(self.max_iterations):
-            z = z*z + c
-            if abs(z) > self.escape_radius:
-                if smooth:
-                    return iter + 1 - log(log(abs(z)))/log(2)
-                return iter
-        return self.max_iterations
-
-
-mandelbrot_set = MandelbrotSet(max_iterations=50, escape_radius=10)
+args = render_parser("Mandelbrot séquentiel").parse_args()
+mandelbrot_set = MandelbrotSet(max_iterations=args.max_iterations, escape_radius=10)
 width, height = 1024, 1024
 
-scaleX = 3./width
-scaleY = 2.25/height
-convergence = np.empty((width, height), dtype=np.double)
 deb = time()
-for y in range(height):
-    for x in range(width):
-        c = complex(-2. + scaleX*x, -1.125 + scaleY * y)
-        convergence[x, y] = mandelbrot_set.convergence(c, smooth=True)
+# Calcul vectorisé : toute l'image d'un coup, convergence[y, x]
+convergence = compute_rows(mandelbrot_set, width, height, range(height))
 fin = time()
 print(f"Temps du calcul de l'ensemble de Mandelbrot : {fin-deb}")
 
-deb = time()
-plt.imshow(matplotlib.cm.plasma(convergence.T))
-plt.axis('off')
-plt.show()
-fin = time()
-print(f"Temps de constitution de l'image : {fin-deb}")
+output_image(convergence, args)
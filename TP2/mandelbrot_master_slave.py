@@ -1,108 +1,148 @@
 from mpi4py import MPI
 import numpy as np
-from dataclasses import dataclass
-from math import log
-import matplotlib.cm
-import matplotlib.pyplot as plt
+from collections import deque
 from time import time
+from mandelbrot_set import MandelbrotSet, compute_rows
+from mandelbrot_output import render_parser, output_image
 
 TAG_WORK = 1
 TAG_DONE = 2
 TAG_STOP = 3
 
-@dataclass
-class MandelbrotSet:
-    max_iterations: int
-    escape_radius: float = 2.0
-
-    def convergence(self, c: complex, smooth=False, clamp=True) -> float:
-        value = self.count_iterations(c, smooth) / self.max_iterations
-        return max(0.0, min(value, 1.0)) if clamp else value
-
-    def count_iterations(self, c: complex, smooth=False) -> int | float:
-        if c.real*c.real + c.imag*c.imag < 0.0625:
-            return self.max_iterations
-        if (c.real+1)*(c.real+1) + c.imag*c.imag < 0.0625:
-            return self.max_iterations
-        if (-0.75 < c.real < 0.5):
-            ct = c.real - 0.25 + 1.j * c.imag
-            ctnrm2 = abs(ct)
-            if ctnrm2 < 0.5*(1-ct.real/max(ctnrm2, 1.E-14)):
-                return self.max_iterations
-
-        z = 0
-        for it in range(self.max_iterations):
-            z = z*z + c
-            if abs(z) > self.escape_radius:
-                if smooth:
-                    return it + 1 - log(log(abs(z)))/log(2)
-                return it
-        return self.max_iterations
-
-def compute_one_row(mset, width, height, y, xmin=-2.0, ymin=-1.125, xspan=3.0, yspan=2.25):
-    scaleX = xspan / width
-    scaleY = yspan / height
-    row = np.empty((width,), dtype=np.float64)
-    for x in range(width):
-        c = complex(xmin + scaleX * x, ymin + scaleY * y)
-        row[x] = mset.convergence(c, smooth=True)
-    return row
+# Ordonnancement dynamique par paquets de lignes ("guided") :
+#   - la taille d'un paquet est proportionnelle au travail restant
+#     (restant / (2*size)), sans descendre sous MIN_CHUNK lignes ;
+#   - chaque esclave a toujours un paquet d'avance (PREFETCH paquets en cours),
+#     il n'attend donc jamais le maître entre deux paquets ;
+#   - le rang 0 calcule aussi des paquets entre deux réceptions ;
+#   - un paquet est décrit par le tableau [y0, n] et le résultat est reçu
+#     directement dans full[y0:y0+n] (Send/Recv sur tampons, sans pickle).
+MIN_CHUNK = 4
+PREFETCH = 2
+
+
+def compute_chunk(mset, width, height, y0, n):
+    return compute_rows(mset, width, height, range(y0, y0 + n))
+
+
+class GuidedScheduler:
+    def __init__(self, height, size, min_chunk=MIN_CHUNK):
+        self.height = height
+        self.size = size
+        self.min_chunk = min_chunk
+        self.next_y = 0
+
+    def remaining(self):
+        return self.height - self.next_y
+
+    def next_chunk(self):
+        n = max(self.min_chunk, self.remaining() // (2 * self.size))
+        n = min(n, self.remaining())
+        y0 = self.next_y
+        self.next_y += n
+        return y0, n
+
+
+def master(comm, mset, width, height):
+    size = comm.Get_size()
+    full = np.empty((height, width), dtype=np.float64)
+    sched = GuidedScheduler(height, size)
+    # Paquets envoyés à chaque esclave, dans l'ordre où il les traitera
+    queues = [deque() for _ in range(size)]
+    stopped = [False] * size
+    outstanding = 0
+    rows_done = np.zeros(size, dtype=np.int64)
+
+    def give_work(worker):
+        nonlocal outstanding
+        if sched.remaining() > 0:
+            y0, n = sched.next_chunk()
+            comm.Send(np.array([y0, n], dtype=np.int64), dest=worker, tag=TAG_WORK)
+            queues[worker].append((y0, n))
+            outstanding += 1
+        elif not stopped[worker]:
+            comm.Send(np.zeros(2, dtype=np.int64), dest=worker, tag=TAG_STOP)
+            stopped[worker] = True
+
+    def receive(status):
+        nonlocal outstanding
+        worker = status.Get_source()
+        y0, n = queues[worker].popleft()
+        comm.Recv(full[y0:y0 + n], source=worker, tag=TAG_DONE)
+        rows_done[worker] += n
+        outstanding -= 1
+        give_work(worker)
+
+    for _ in range(PREFETCH):
+        for dest in range(1, size):
+            give_work(dest)
+
+    status = MPI.Status()
+    while outstanding > 0 or sched.remaining() > 0:
+        # On traite d'abord tous les résultats déjà arrivés...
+        while outstanding > 0 and comm.Iprobe(source=MPI.ANY_SOURCE, tag=TAG_DONE, status=status):
+            receive(status)
+        # ...puis le rang 0 calcule un paquet lui-même, ou attend s'il n'y a plus rien à distribuer
+        if sched.remaining() > 0:
+            y0, n = sched.next_chunk()
+            full[y0:y0 + n] = compute_chunk(mset, width, height, y0, n)
+            rows_done[0] += n
+        elif outstanding > 0:
+            comm.Probe(source=MPI.ANY_SOURCE, tag=TAG_DONE, status=status)
+            receive(status)
+
+    return full, rows_done
+
+
+def worker(comm, mset, width, height):
+    status = MPI.Status()
+    current = np.empty(2, dtype=np.int64)
+    prefetched = np.empty(2, dtype=np.int64)
+    comm.Recv(current, source=0, tag=MPI.ANY_TAG, status=status)
+    stop = status.Get_tag() == TAG_STOP
+    # Réception du paquet suivant pendant le calcul du paquet courant
+    recv_req = None if stop else comm.Irecv(prefetched, source=0, tag=MPI.ANY_TAG)
+    send_req = None
+    while not stop:
+        y0, n = current
+        block = compute_chunk(mset, width, height, int(y0), int(n))
+        if send_req is not None:
+            send_req.Wait()
+        send_req = comm.Isend(block, dest=0, tag=TAG_DONE)
+        recv_req.Wait(status)
+        stop = status.Get_tag() == TAG_STOP
+        current, prefetched = prefetched, current
+        if not stop:
+            recv_req = comm.Irecv(prefetched, source=0, tag=MPI.ANY_TAG)
+    if send_req is not None:
+        send_req.Wait()
+
 
 def main():
     comm = MPI.COMM_WORLD
     rank = comm.Get_rank()
     size = comm.Get_size()
 
-    mset = MandelbrotSet(max_iterations=50, escape_radius=10.0)
+    args = render_parser("Mandelbrot MPI, maître-esclave par paquets").parse_args()
+    max_iterations = args.max_iterations
+    mset = MandelbrotSet(max_iterations=max_iterations, escape_radius=10.0)
     width, height = 1024, 1024
 
     comm.Barrier()
     t0 = time()
 
     if rank == 0:
-        full = np.empty((height, width), dtype=np.float64)
-
-        next_y = 0
-        active = 0
-
-        for worker in range(1, size):
-            if next_y < height:
-                comm.send(next_y, dest=worker, tag=TAG_WORK)
-                next_y += 1
-                active += 1
-            else:
-                comm.send(None, dest=worker, tag=TAG_STOP)
-
-        while active > 0:
-            status = MPI.Status()
-            y, row = comm.recv(source=MPI.ANY_SOURCE, tag=TAG_DONE, status=status)
-            full[y, :] = row
-
-            worker = status.Get_source()
-
-            if next_y < height:
-                comm.send(next_y, dest=worker, tag=TAG_WORK)
-                next_y += 1
-            else:
-                comm.send(None, dest=worker, tag=TAG_STOP)
-                active -= 1
+        full, rows_done = master(comm, mset, width, height)
 
         comm.Barrier()
         t1 = time()
-        print(f"Temps calcul (master-worker): {t1 - t0:.3f}s, np={size}")
+        print(f"Temps calcul (master-worker): {t1 - t0:.3f}s, np={size}, max_iterations={max_iterations}")
+        print(f"Lignes calculées par rang : {rows_done.tolist()}")
 
-        plt.imshow(matplotlib.cm.plasma(full))
-        plt.axis("off")
-        plt.show()
+        output_image(full, args)
 
     else:
-        while True:
-            y = comm.recv(source=0, tag=MPI.ANY_TAG)
-            status = MPI.Status()
-            if y is None:
-                break
-            row = compute_one_row(mset, width, height, y)
-            comm.send((y, row), dest=0, tag=TAG_DONE)
+        worker(comm, mset, width, height)
 
         comm.Barrier()
 
@@ -0,0 +1,121 @@
+# Sortie des images de Mandelbrot sans affichage (mode "batch")
+#
+# Sur un nœud de calcul, il n'y a pas d'écran : plutôt que plt.imshow/plt.show,
+# les scripts peuvent écrire l'image de convergence
+#   - en .npy (tableau float64 brut, relisible avec np.load / np.load(mmap_mode="r")),
+#   - en .raw (float64 brut, écrit via np.memmap, relisible avec np.memmap),
+#   - en .png, coloré avec une table de couleurs (LUT) "plasma" de 256 entrées
+#     et encodé directement avec zlib (ni matplotlib ni PIL).
+# matplotlib n'est importé que si l'affichage est demandé (--show).
+import argparse
+import os
+import struct
+import zlib
+import numpy as np
+from time import time
+
+# Couleurs de la carte "plasma" de matplotlib échantillonnée en 17 points,
+# interpolées linéairement pour former une LUT de 256 couleurs.
+_PLASMA_ANCHORS = np.array([
+    [13, 8, 135], [49, 5, 151], [76, 2, 161], [102, 0, 167], [126, 3, 168],
+    [149, 17, 161], [170, 35, 149], [188, 53, 135], [204, 71, 120], [218, 90, 106],
+    [230, 108, 92], [240, 128, 78], [248, 149, 64], [253, 172, 51], [253, 197, 39],
+    [248, 223, 37], [240, 249, 33]], dtype=np.float64)
+
+
+def make_lut(anchors=_PLASMA_ANCHORS, n=256):
+    x = np.linspace(0., 1., n)
+    xa = np.linspace(0., 1., len(anchors))
+    lut = np.empty((n, 3), dtype=np.uint8)
+    for k in range(3):
+        lut[:, k] = np.rint(np.interp(x, xa, anchors[:, k]))
+    return lut
+
+
+PLASMA_LUT = make_lut()
+
+
+def colorize(convergence, lut=PLASMA_LUT):
+    """
+    Image RGB (uint8) de forme convergence.shape + (3,), valeurs dans [0, 1] attendues.
+    """
+    n = lut.shape[0]
+    idx = np.clip(convergence * n, 0, n - 1).astype(np.intp)
+    return lut[idx]
+
+
+def write_png(path, rgb, compress_level=1):
+    """
+    Écrit une image RGB uint8 (hauteur, largeur, 3) au format PNG (8 bits, sans filtre).
+    """
+    height, width, _ = rgb.shape
+    raw = np.empty((height, 1 + 3 * width), dtype=np.uint8)
+    raw[:, 0] = 0  # type de filtre "None" pour chaque ligne
+    raw[:, 1:] = rgb.reshape(height, 3 * width)
+
+    def chunk(tag, data):
+        return (struct.pack(">I", len(data)) + tag + data
+                + struct.pack(">I", zlib.crc32(tag + data) & 0xffffffff))
+
+    with open(path, "wb") as f:
+        f.write(b"\x89PNG\r\n\x1a\n")
+        f.write(chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)))
+        f.write(chunk(b"IDAT", zlib.compress(raw.tobytes(), compress_level)))
+        f.write(chunk(b"IEND", b""))
+
+
+def save(convergence, path):
+    """
+    Écrit l'image de convergence dans path ; le format est choisi selon l'extension.
+    """
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".png":
+        write_png(path, colorize(convergence))
+    elif ext == ".npy":
+        np.save(path, convergence)
+    elif ext == ".raw":
+        mm = np.memmap(path, dtype=convergence.dtype, mode="w+", shape=convergence.shape)
+        mm[:] = convergence
+        mm.flush()
+        del mm
+    else:
+        raise ValueError(f"Format de sortie inconnu : {path} (.png, .npy ou .raw)")
+
+
+def show(convergence):
+    import matplotlib.cm
+    import matplotlib.pyplot as plt
+    plt.imshow(matplotlib.cm.plasma(convergence))
+    plt.axis("off")
+    plt.show()
+
+
+def render_parser(description):
+    """
+    Options communes des scripts de rendu : max_iterations (positionnel,
+    50 par défaut), --output et --show.
+    """
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument("max_iterations", nargs="?", type=int, default=50)
+    add_output_arguments(parser)
+    return parser
+
+
+def add_output_arguments(parser):
+    parser.add_argument("-o", "--output",
+                        help="fichier de sortie (.png, .npy ou .raw) ; sans --show, aucun affichage")
+    parser.add_argument("--show", action="store_true",
+                        help="afficher l'image avec matplotlib (par défaut si pas de --output)")
+
+
+def output_image(convergence, args):
+    """
+    Écrit et/ou affiche l'image selon les options --output/--show et affiche
+    le temps d'encodage.
+    """
+    if args.output:
+        deb = time()
+        save(convergence, args.output)
+        print(f"  encodage ({args.output}) : {time() - deb:.3f}s")
+    if args.show or not args.output:
+        show(convergence)
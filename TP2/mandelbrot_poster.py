@@ -0,0 +1,108 @@
+# Rendu de très grandes images de Mandelbrot (posters 32k x 32k et plus)
+#
+# L'image n'est jamais rassemblée en mémoire : elle est découpée en bandes de
+# band_rows lignes, distribuées cycliquement entre les rangs MPI (bande b pour
+# le rang b % size). Chaque rang calcule ses bandes une par une et les écrit
+# directement à leur place dans un fichier .npy partagé, soit avec MPI-IO
+# (File.Write_at), soit via un np.memmap limité à la bande. La mémoire utilisée
+# par rang est donc bornée par la taille d'une bande, quel que soit le poster.
+#
+# Le fichier produit se relit avec np.load(fichier, mmap_mode="r").
+#
+# Usage : mpirun -np 4 python mandelbrot_poster.py poster.npy [--width W] [--height H]
+#                [--band-rows B] [--backend mpiio|memmap] [--dtype float32|float64]
+#                [max_iterations]
+import argparse
+from mpi4py import MPI
+import numpy as np
+from time import time
+from mandelbrot_set import MandelbrotSet, compute_rows
+
+
+def create_npy(path, shape, dtype):
+    """
+    Crée le fichier .npy (en-tête + données non initialisées) et renvoie la
+    position du début des données dans le fichier.
+    """
+    mm = np.lib.format.open_memmap(path, mode="w+", dtype=dtype, shape=shape)
+    offset = mm.offset
+    del mm
+    return offset
+
+
+def render_poster(comm, mset, path, width, height, band_rows, backend="mpiio", dtype=np.float32):
+    """
+    Calcule l'image (height, width) bande par bande et l'écrit dans path.
+    Renvoie (temps de calcul, temps d'écriture, nombre de lignes) pour ce rang.
+    """
+    rank = comm.Get_rank()
+    size = comm.Get_size()
+    dtype = np.dtype(dtype)
+    offset = create_npy(path, (height, width), dtype) if rank == 0 else None
+    offset = comm.bcast(offset, root=0)
+    row_bytes = width * dtype.itemsize
+
+    fh = MPI.File.Open(comm, path, MPI.MODE_WRONLY) if backend == "mpiio" else None
+    t_compute = t_write = 0.
+    nrows = 0
+    nbands = (height + band_rows - 1) // band_rows
+    for band in range(rank, nbands, size):
+        y0 = band * band_rows
+        n = min(band_rows, height - y0)
+        deb = time()
+        block = compute_rows(mset, width, height, range(y0, y0 + n)).astype(dtype, copy=False)
+        t_compute += time() - deb
+
+        deb = time()
+        if backend == "mpiio":
+            fh.Write_at(offset + y0 * row_bytes, block)
+        else:
+            mm = np.memmap(path, dtype=dtype, mode="r+", offset=offset + y0 * row_bytes, shape=(n, width))
+            mm[:] = block
+            mm.flush()
+            del mm
+        t_write += time() - deb
+        nrows += n
+    if fh is not None:
+        fh.Close()
+    return t_compute, t_write, nrows
+
+
+def main():
+    comm = MPI.COMM_WORLD
+    rank = comm.Get_rank()
+    size = comm.Get_size()
+
+    parser = argparse.ArgumentParser(description="Poster de Mandelbrot écrit hors mémoire")
+    parser.add_argument("output", help="fichier .npy de sortie (sur un système de fichiers partagé)")
+    parser.add_argument("max_iterations", nargs="?", type=int, default=50)
+    parser.add_argument("--width", type=int, default=32768)
+    parser.add_argument("--height", type=int, default=32768)
+    parser.add_argument("--band-rows", type=int, default=64)
+    parser.add_argument("--backend", choices=("mpiio", "memmap"), default="mpiio")
+    parser.add_argument("--dtype", choices=("float32", "float64"), default="float32")
+    args = parser.parse_args()
+
+    mset = MandelbrotSet(max_iterations=args.max_iterations, escape_radius=10.0)
+    band_bytes = args.band_rows * args.width * np.dtype(args.dtype).itemsize
+
+    comm.Barrier()
+    t0 = time()
+    t_compute, t_write, nrows = render_poster(comm, mset, args.output, args.width, args.height,
+                                              args.band_rows, args.backend, args.dtype)
+    comm.Barrier()
+    t1 = time()
+
+    stats = comm.gather((t_compute, t_write, nrows), root=0)
+    if rank == 0:
+        total_bytes = args.width * args.height * np.dtype(args.dtype).itemsize
+        print(f"Poster {args.width}x{args.height} ({total_bytes/2**30:.2f} Go) -> {args.output}, "
+              f"np={size}, backend={args.backend}, bande {args.band_rows} lignes ({band_bytes/2**20:.1f} Mo)")
+        print(f"Temps total : {t1 - t0:.3f}s, débit global (calcul + écriture) {total_bytes/2**20/(t1 - t0):.1f} Mo/s")
+        for r, (tc, tw, n) in enumerate(stats):
+            print(f"  rang {r}: calcul {tc:.3f}s, écriture {tw:.3f}s "
+                  f"({n * args.width * np.dtype(args.dtype).itemsize/2**20/max(tw, 1e-9):.1f} Mo/s), {n} lignes")
+
+
+if __name__ == "__main__":
+    main()
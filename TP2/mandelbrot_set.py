@@ -0,0 +1,158 @@
+# Module commun de calcul de l'ensemble de Mandelbrot
+#
+# Les scripts mandelbrot*.py importent d'ici la classe MandelbrotSet et les
+# fonctions de calcul par lignes. Le calcul "scalaire" (un complexe à la fois)
+# est conservé pour référence, mais les pilotes utilisent la version vectorisée
+# qui traite une ligne ou un bloc entier sous forme de tableau de complexes.
+import numpy as np
+from dataclasses import dataclass
+from math import log
+
+# Fenêtre par défaut du plan complexe utilisée par tous les scripts du TP2
+XMIN, YMIN, XSPAN, YSPAN = -2.0, -1.125, 3.0, 2.25
+
+
+@dataclass
+class MandelbrotSet:
+    max_iterations: int
+    escape_radius:  float = 2.0
+    # Détection de cycle (Brent) : on compare z à un point de contrôle mis à
+    # jour aux itérations 1, 2, 4, 8... Si z revient à moins de
+    # periodicity_tolerance de ce point, l'orbite est périodique donc bornée.
+    periodicity:    bool = False
+    periodicity_tolerance: float = 1.E-12
+
+    def __contains__(self, c: complex) -> bool:
+        return self.convergence(c) == 1
+
+    def convergence(self, c, smooth=False, clamp=True):
+        """
+        Valeur de convergence normalisée dans [0, 1] (si clamp) pour un
+        complexe ou pour un tableau numpy de complexes.
+        """
+        value = self.count_iterations(c, smooth)/self.max_iterations
+        if isinstance(value, np.ndarray):
+            return np.clip(value, 0.0, 1.0, out=value) if clamp else value
+        return max(0.0, min(value, 1.0)) if clamp else value
+
+    def count_iterations(self, c, smooth=False):
+        """
+        Nombre d'itérations avant divergence. Si c est un tableau numpy, le
+        calcul est fait en bloc (voir count_iterations_array).
+        """
+        if isinstance(c, np.ndarray):
+            return self.count_iterations_array(c, smooth)
+        z:    complex
+        iter: int
+
+        # On vérifie dans un premier temps si le complexe
+        # n'appartient pas à une zone de convergence connue :
+        #   1. Appartenance aux disques  C0{(0,0),1/4} et C1{(-1,0),1/4}
+        if c.real*c.real+c.imag*c.imag < 0.0625:
+            return self.max_iterations
+        if (c.real+1)*(c.real+1)+c.imag*c.imag < 0.0625:
+            return self.max_iterations
+        #  2.  Appartenance à la cardioïde {(1/4,0),1/2(1-cos(theta))}
+        if (c.real > -0.75) and (c.real < 0.5):
+            ct = c.real-0.25 + 1.j * c.imag
+            ctnrm2 = abs(ct)
+            if ctnrm2 < 0.5*(1-ct.real/max(ctnrm2, 1.E-14)):
+                return self.max_iterations
+        z = 0
+        z_check, next_check = 0, 1
+        for iter in range(self.max_iterations):
+            z = z*z + c
+            if abs(z) > self.escape_radius:
+                if smooth:
+                    return iter + 1 - log(log(abs(z)))/log(2)
+                return iter
+            if self.periodicity:
+                if abs(z - z_check) < self.periodicity_tolerance:
+                    return self.max_iterations
+                if iter + 1 == next_check:
+                    z_check, next_check = z, 2*next_check
+        return self.max_iterations
+
+    def count_iterations_array(self, c: np.ndarray, smooth=False) -> np.ndarray:
+        """
+        Version vectorisée de count_iterations : c est un tableau de complexes
+        de forme quelconque (une ligne, un bloc de lignes, une tuile...).
+        Renvoie un tableau de float64 de même forme, avec les mêmes valeurs
+        que le calcul scalaire.
+        """
+        c = np.asarray(c, dtype=np.complex128)
+        result = np.full(c.shape, self.max_iterations, dtype=np.float64)
+        flat = result.reshape(-1)
+        cr, ci = c.real, c.imag
+
+        # Mêmes tests que le calcul scalaire, sous forme de masques booléens :
+        #   1. disques C0{(0,0),1/4} et C1{(-1,0),1/4}
+        inside = cr*cr + ci*ci < 0.0625
+        inside |= (cr+1)*(cr+1) + ci*ci < 0.0625
+        #   2. cardioïde {(1/4,0),1/2(1-cos(theta))}
+        ctr = cr - 0.25
+        ctnrm2 = np.hypot(ctr, ci)
+        inside |= ((cr > -0.75) & (cr < 0.5)
+                   & (ctnrm2 < 0.5*(1-ctr/np.maximum(ctnrm2, 1.E-14))))
+
+        # On n'itère que sur les points restants ; idx garde leur position
+        # dans le tableau résultat (mis à plat)
+        idx = np.flatnonzero(~inside)
+        cc = c.reshape(-1)[idx]
+        z = np.zeros_like(cc)
+        inv_log2 = 1./log(2)
+        if self.periodicity:
+            z_check, next_check = z.copy(), 8
+            tol2 = self.periodicity_tolerance**2
+        for it in range(self.max_iterations):
+            if idx.size == 0:
+                break
+            np.multiply(z, z, out=z)
+            z += cc
+            modz = np.abs(z)
+            escaped = modz > self.escape_radius
+            if escaped.any():
+                if smooth:
+                    flat[idx[escaped]] = it + 1 - np.log(np.log(modz[escaped]))*inv_log2
+                else:
+                    flat[idx[escaped]] = it
+                # On retire les points qui ont divergé
+                keep = ~escaped
+                idx, cc, z = idx[keep], cc[keep], z[keep]
+                if self.periodicity:
+                    z_check = z_check[keep]
+            # Le test de cycle coûte autant qu'une itération : on ne le fait que
+            # toutes les 8 itérations (les points de contrôle, aux puissances de
+            # 2 à partir de 8, tombent sur ces itérations)
+            if self.periodicity and (it + 1) % 8 == 0:
+                dz = z - z_check
+                # Les points cycliques gardent la valeur max_iterations
+                bounded = dz.real*dz.real + dz.imag*dz.imag < tol2
+                if bounded.any():
+                    keep = ~bounded
+                    idx, cc, z, z_check = idx[keep], cc[keep], z[keep], z_check[keep]
+                if it + 1 == next_check:
+                    z_check, next_check = z.copy(), 2*next_check
+        return result
+
+
+def complex_rows(width, height, ys, xmin=XMIN, ymin=YMIN, xspan=XSPAN, yspan=YSPAN):
+    """
+    Tableau (len(ys), width) des complexes associés aux lignes ys de l'image.
+    """
+    scaleX = xspan / width
+    scaleY = yspan / height
+    ys = np.asarray(ys, dtype=np.float64)
+    c = np.empty((ys.size, width), dtype=np.complex128)
+    c.real = xmin + scaleX * np.arange(width, dtype=np.float64)
+    c.imag = (ymin + scaleY * ys)[:, None]
+    return c
+
+
+def compute_rows(mset, width, height, ys, xmin=XMIN, ymin=YMIN, xspan=XSPAN, yspan=YSPAN):
+    """
+    Convergence (lissée) des lignes ys de l'image, calculée d'un bloc.
+    ys peut être un range (bloc contigu, lignes cycliques...) ou un tableau d'indices.
+    """
+    c = complex_rows(width, height, ys, xmin, ymin, xspan, yspan)
+    return mset.convergence(c, smooth=True)
@@ -0,0 +1,117 @@
+# Calcul de l'ensemble de Mandelbrot sur un seul nœud multi-cœur, sans MPI
+#
+# Des processus (multiprocessing) écrivent directement leurs lignes dans une
+# image partagée (multiprocessing.shared_memory) : aucune donnée de pixel n'est
+# sérialisée. On retrouve les trois répartitions des scripts MPI :
+#   - block   : chaque processus calcule un bloc de lignes contiguës (mandelbrot_block.py)
+#   - cyclic  : le processus p calcule les lignes p, p+n, p+2n... (mandelbrot_cyclic.py)
+#   - dynamic : les processus prennent des paquets de lignes de taille décroissante
+#               ("guided", comme mandelbrot_master_slave.py) via un compteur partagé
+#
+# Usage : python mandelbrot_shm.py [max_iterations] [--schedule block|cyclic|dynamic]
+#                                  [--workers N] [--output image.png|.npy|.raw] [--show]
+import os
+import numpy as np
+from multiprocessing import Process, Value, Array
+from multiprocessing.shared_memory import SharedMemory
+from time import time
+from mandelbrot_set import MandelbrotSet, compute_rows
+from mandelbrot_output import render_parser, output_image
+
+SCHEDULES = ("block", "cyclic", "dynamic")
+MIN_CHUNK = 4
+
+
+def block_rows(height, nworkers, p):
+    base = height // nworkers
+    rem = height % nworkers
+    y0 = p * base + min(p, rem)
+    return range(y0, y0 + base + (1 if p < rem else 0))
+
+
+def next_chunk(next_y, height, nworkers):
+    """
+    Réserve le prochain paquet de lignes (taille guidée) ; renvoie (y0, n), n == 0 à la fin.
+    """
+    with next_y.get_lock():
+        y0 = next_y.value
+        n = min(max(MIN_CHUNK, (height - y0) // (2 * nworkers)), height - y0)
+        next_y.value = y0 + n
+    return y0, n
+
+
+def worker(p, nworkers, schedule, shm_name, width, height, max_iterations,
+           next_y, times, rows):
+    shm = SharedMemory(name=shm_name)
+    image = np.ndarray((height, width), dtype=np.float64, buffer=shm.buf)
+    mset = MandelbrotSet(max_iterations=max_iterations, escape_radius=10.0)
+    deb = time()
+    if schedule == "dynamic":
+        nrows = 0
+        y0, n = next_chunk(next_y, height, nworkers)
+        while n > 0:
+            image[y0:y0 + n] = compute_rows(mset, width, height, range(y0, y0 + n))
+            nrows += n
+            y0, n = next_chunk(next_y, height, nworkers)
+    else:
+        ys = block_rows(height, nworkers, p) if schedule == "block" else range(p, height, nworkers)
+        image[ys.start:ys.stop:ys.step] = compute_rows(mset, width, height, ys)
+        nrows = len(ys)
+    times[p] = time() - deb
+    rows[p] = nrows
+    del image
+    shm.close()
+
+
+def compute_shared(width, height, max_iterations, schedule="dynamic", nworkers=None):
+    """
+    Calcule l'image avec nworkers processus ; renvoie (image, temps par processus,
+    lignes par processus).
+    """
+    if schedule not in SCHEDULES:
+        raise ValueError(f"Répartition inconnue : {schedule} (choix : {SCHEDULES})")
+    nworkers = nworkers or os.cpu_count()
+    shm = SharedMemory(create=True, size=width * height * np.dtype(np.float64).itemsize)
+    try:
+        next_y = Value("q", 0)
+        times = Array("d", nworkers, lock=False)
+        rows = Array("q", nworkers, lock=False)
+        procs = [Process(target=worker,
+                         args=(p, nworkers, schedule, shm.name, width, height, max_iterations,
+                               next_y, times, rows))
+                 for p in range(nworkers)]
+        for proc in procs:
+            proc.start()
+        for proc in procs:
+            proc.join()
+        if any(proc.exitcode != 0 for proc in procs):
+            raise RuntimeError("Un processus de calcul a échoué")
+        image = np.ndarray((height, width), dtype=np.float64, buffer=shm.buf).copy()
+    finally:
+        shm.close()
+        shm.unlink()
+    return image, np.array(times), np.array(rows)
+
+
+def main():
+    parser = render_parser("Mandelbrot multi-processus en mémoire partagée")
+    parser.add_argument("--schedule", choices=SCHEDULES, default="dynamic")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    width, height = 1024, 1024
+    deb = time()
+    image, times, rows = compute_shared(width, height, args.max_iterations,
+                                       args.schedule, args.workers)
+    fin = time()
+    print(f"Temps calcul ({args.schedule}, mémoire partagée): {fin-deb:.3f}s, "
+          f"workers={args.workers}, max_iterations={args.max_iterations}")
+    for p in range(args.workers):
+        print(f"  worker {p}: {times[p]:.3f}s, {rows[p]} lignes")
+    print(f"  déséquilibre (max/moyenne) : {times.max()/times.mean():.2f}")
+
+    output_image(image, args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+# Rendu de l'ensemble de Mandelbrot par tuiles, avec cache
+#
+# Le plan complexe est découpé en tuiles de tile_size x tile_size pixels.
+# Au niveau de zoom 0, une tuile couvre exactement la fenêtre par défaut
+# (XMIN, YMIN, XSPAN, YSPAN) ; à chaque niveau de zoom la taille d'une tuile
+# dans le plan complexe est divisée par deux. Une tuile est identifiée par la
+# clé (zoom, tx, ty, max_iterations, tile_size, escape_radius) et ne dépend que
+# de cette clé (un même cache disque peut donc servir à plusieurs rendus) : on peut
+# donc la garder en cache et ne recalculer, lors d'un déplacement ou d'un
+# zoom, que les tuiles manquantes.
+#
+# Usage : python mandelbrot_tiles.py [--disk-cache repertoire] [--output image.png|.npy|.raw] [--show]
+import argparse
+import os
+from collections import OrderedDict
+import numpy as np
+from time import time
+from mandelbrot_set import MandelbrotSet, compute_rows, XMIN, YMIN, XSPAN, YSPAN
+from mandelbrot_output import add_output_arguments, show, save
+
+
+class TileCache:
+    """
+    Cache LRU de tuiles en mémoire, borné par un budget en octets.
+    Si disk_dir est donné, les tuiles calculées y sont aussi écrites (.npy)
+    et relues en cas d'absence en mémoire.
+    """
+    def __init__(self, max_bytes=256 * 2**20, disk_dir=None):
+        self.max_bytes = max_bytes
+        self.disk_dir = disk_dir
+        self.nbytes = 0
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._tiles = OrderedDict()
+        if disk_dir is not None:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    def __contains__(self, key):
+        return key in self._tiles
+
+    def __len__(self):
+        return len(self._tiles)
+
+    def _disk_path(self, key):
+        return os.path.join(self.disk_dir, "tile_{}_{}_{}_{}_{}_{}.npy".format(*key))
+
+    def get(self, key, shape=None):
+        """
+        Renvoie la tuile (en lecture seule) ou None si elle n'est ni en mémoire
+        ni sur disque. Si shape est donné, une tuile lue sur disque d'une autre
+        forme (fichier tronqué ou corrompu) est ignorée.
+        """
+        tile = self._tiles.get(key)
+        if tile is not None:
+            self._tiles.move_to_end(key)
+            self.hits += 1
+            return tile
+        if self.disk_dir is not None:
+            path = self._disk_path(key)
+            if os.path.exists(path):
+                tile = np.load(path)
+                if shape is None or tile.shape == shape:
+                    self.disk_hits += 1
+                    self._insert(key, tile)
+                    return tile
+        self.misses += 1
+        return None
+
+    def put(self, key, tile):
+        self._insert(key, tile)
+        if self.disk_dir is not None:
+            np.save(self._disk_path(key), tile)
+
+    def _insert(self, key, tile):
+        # Les tuiles sont partagées entre les vues : on interdit leur modification
+        tile.flags.writeable = False
+        old = self._tiles.pop(key, None)
+        if old is not None:
+            self.nbytes -= old.nbytes
+        self._tiles[key] = tile
+        self.nbytes += tile.nbytes
+        # Éviction des tuiles les moins récemment utilisées (on garde au moins
+        # la tuile qui vient d'être insérée)
+        while self.nbytes > self.max_bytes and len(self._tiles) > 1:
+            _, evicted = self._tiles.popitem(last=False)
+            self.nbytes -= evicted.nbytes
+
+
+class TileRenderer:
+    """
+    Calcule et assemble les tuiles d'une vue. Les tuiles absentes du cache
+    sont calculées avec le noyau vectorisé de mandelbrot_set.
+    """
+    def __init__(self, tile_size=256, escape_radius=10., cache=None):
+        self.tile_size = tile_size
+        self.escape_radius = escape_radius
+        self.cache = cache if cache is not None else TileCache()
+        self._msets = {}
+
+    def tile_window(self, zoom, tx, ty):
+        """
+        Fenêtre (xmin, ymin, xspan, yspan) du plan complexe couverte par la tuile.
+        """
+        xspan = XSPAN / 2**zoom
+        yspan = YSPAN / 2**zoom
+        return XMIN + tx * xspan, YMIN + ty * yspan, xspan, yspan
+
+    def compute_tile(self, zoom, tx, ty, max_iterations):
+        mset = self._msets.get(max_iterations)
+        if mset is None:
+            mset = self._msets[max_iterations] = MandelbrotSet(max_iterations, self.escape_radius)
+        xmin, ymin, xspan, yspan = self.tile_window(zoom, tx, ty)
+        n = self.tile_size
+        return compute_rows(mset, n, n, range(n), xmin=xmin, ymin=ymin, xspan=xspan, yspan=yspan)
+
+    def tile(self, zoom, tx, ty, max_iterations):
+        key = (zoom, tx, ty, max_iterations, self.tile_size, self.escape_radius)
+        tile = self.cache.get(key, shape=(self.tile_size, self.tile_size))
+        if tile is None:
+            tile = self.compute_tile(zoom, tx, ty, max_iterations)
+            self.cache.put(key, tile)
+        return tile
+
+    def render(self, zoom, tx0, ty0, ntx, nty, max_iterations, out=None):
+        """
+        Image (nty*tile_size, ntx*tile_size) formée des tuiles [tx0, tx0+ntx) x
+        [ty0, ty0+nty) du niveau zoom. Seules les tuiles absentes du cache sont
+        calculées.
+        """
+        n = self.tile_size
+        if out is None:
+            out = np.empty((nty * n, ntx * n), dtype=np.float64)
+        for j in range(nty):
+            for i in range(ntx):
+                out[j*n:(j+1)*n, i*n:(i+1)*n] = self.tile(zoom, tx0 + i, ty0 + j, max_iterations)
+        return out
+
+    def zoom_in(self, zoom, tx0, ty0, ntx, nty):
+        """
+        Coordonnées (zoom, tx0, ty0) de la vue de même taille en tuiles, deux
+        fois plus zoomée, centrée sur la vue courante.
+        """
+        return zoom + 1, 2*tx0 + ntx//2, 2*ty0 + nty//2
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rendu de Mandelbrot par tuiles avec cache")
+    parser.add_argument("--disk-cache", help="répertoire du cache de tuiles sur disque")
+    add_output_arguments(parser)
+    args = parser.parse_args()
+
+    renderer = TileRenderer(tile_size=256, cache=TileCache(max_bytes=64 * 2**20, disk_dir=args.disk_cache))
+    max_iterations = 200
+
+    # Vue initiale : fenêtre par défaut au zoom 2 (4x4 tuiles), puis
+    # déplacement d'une tuile vers la droite, zoom, et retour à la vue initiale.
+    views = [("vue initiale", (2, 0, 0, 4, 4)),
+             ("déplacement", (2, 1, 0, 4, 4)),
+             ("zoom", (*renderer.zoom_in(2, 1, 0, 4, 4), 4, 4)),
+             ("retour", (2, 0, 0, 4, 4))]
+    for name, view in views:
+        misses = renderer.cache.misses
+        deb = time()
+        image = renderer.render(*view, max_iterations)
+        fin = time()
+        print(f"{name:14s} {view} : {fin-deb:.4f}s, "
+              f"tuiles calculées {renderer.cache.misses - misses}, "
+              f"cache {len(renderer.cache)} tuiles / {renderer.cache.nbytes/2**20:.1f} Mo")
+
+    # Seule la dernière vue est écrite/affichée (et seulement sur demande)
+    if args.output:
+        save(image, args.output)
+    if args.show:
+        show(image)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,6 @@
 # Produit matrice-vecteur v = A.u
 import numpy as np
+from matvec_fft import HankelCirculant
 
 # Dimension du problème (peut-être changé)
 dim = 120
@@ -13,4 +14,9 @@ print(f"u = {u}")
 
 # Produit matrice-vecteur
 v = A.dot(u)
-print(f"v = {v}")
\ No newline at end of file
+print(f"v = {v}")
+
+# A[i,j] ne dépend que de (i+j) % dim : le produit peut se faire par FFT en O(N log N)
+op = HankelCirculant.from_dense(A)
+if op is not None:
+    print(f"v (FFT) = {op.matvec(u)}")
@@ -0,0 +1,70 @@
+from mpi4py import MPI
+import numpy as np
+import sys
+from time import time
+from matvec_kernel import local_matvec, split_rows
+
+# Produit matrice-vecteur avec une décomposition 2D en blocs.
+# Les processus forment une grille pr x pc (Create_cart) ; le processus (r, c)
+# possède le bloc A[I_r, J_c] de taille ~ (N/pr) x (N/pc).
+#   1. u[J_c] est diffusé le long de la colonne c de la grille (Bcast, racine (0, c))
+#   2. chaque processus calcule y = A[I_r, J_c] . u[J_c]
+#   3. les y d'une même ligne r de la grille sont sommés sur (r, 0) (Reduce) : v[I_r]
+# Chaque processus n'échange que O(N/sqrt(p)) réels, contre O(N) en 1D.
+# Si N n'est pas divisible par pr ou pc, les premiers blocs ont une ligne/colonne de plus.
+
+
+def main():
+    comm = MPI.COMM_WORLD
+    size = comm.Get_size()
+
+    N = int(sys.argv[1]) if len(sys.argv) > 1 else 120
+
+    pr, pc = MPI.Compute_dims(size, 2)
+    cart = comm.Create_cart(dims=[pr, pc], periods=[False, False], reorder=False)
+    r, c = cart.Get_coords(cart.Get_rank())
+    row_comm = cart.Sub([False, True])   # même ligne r de la grille, rang = c
+    col_comm = cart.Sub([True, False])   # même colonne c de la grille, rang = r
+
+    row_counts, row_disp = split_rows(N, pr)
+    col_counts, col_disp = split_rows(N, pc)
+    i0, i1 = row_disp[r], row_disp[r] + row_counts[r]
+    j0, j1 = col_disp[c], col_disp[c] + col_counts[c]
+
+    # u[J_c] n'existe au départ que sur la première ligne de la grille
+    u_local = np.empty(j1 - j0, dtype=np.float64)
+    if r == 0:
+        u_local[:] = np.arange(j0 + 1, j1 + 1, dtype=np.float64)
+    y = np.empty(i1 - i0, dtype=np.float64)
+    v_local = np.empty(i1 - i0, dtype=np.float64) if c == 0 else None
+
+    cart.Barrier()
+    t0 = time()
+    col_comm.Bcast(u_local, root=0)
+    t1 = time()
+    local_matvec(N, i0, i1, j0, j1, u_local, out=y)
+    t2 = time()
+    row_comm.Reduce(y, v_local, op=MPI.SUM, root=0)
+    t3 = time()
+
+    times = np.empty(3) if cart.Get_rank() == 0 else None
+    cart.Reduce(np.array([t1 - t0, t2 - t1, t3 - t2]), times, op=MPI.MAX, root=0)
+
+    # Pour l'affichage seulement : on rassemble v (réparti sur la colonne 0) sur le rang 0
+    v = None
+    if c == 0:
+        if r == 0:
+            v = np.empty(N, dtype=np.float64)
+        col_comm.Gatherv(v_local, [v, row_counts, row_disp, MPI.DOUBLE], root=0)
+
+    if cart.Get_rank() == 0:
+        print(f"[2D] N={N}, np={size}, grille {pr}x{pc}, bloc {i1-i0}x{j1-j0}, time={t3-t0:.6f}s "
+              f"(Bcast {times[0]:.6f}s, calcul {times[1]:.6f}s, Reduce {times[2]:.6f}s, max sur les rangs)")
+        print("v =", v)
+
+    row_comm.Free()
+    col_comm.Free()
+    cart.Free()
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,16 @@
 from mpi4py import MPI
 import numpy as np
+import sys
 from time import time
+from matvec_kernel import local_matvec
 
 def main():
     comm = MPI.COMM_WORLD
     rank = comm.Get_rank()
     size = comm.Get_size()
 
-    # Dimension (modifiable)
-    N = 120
+    # Dimension (modifiable en argument, jusqu'à ~10^5)
+    N = int(sys.argv[1]) if len(sys.argv) > 1 else 120
     assert N % size == 0, "N doit être divisible par le nombre de processus"
 
     Nloc = N // size
@@ -19,23 +21,20 @@ def main():
     u = np.arange(1, N + 1, dtype=np.float64)
 
     # Calcul local : contribution des colonnes j0..j1-1
-    # v_part[i] = sum_{j=j0..j1-1} A[i,j]*u[j]
-    v_part = np.zeros(N, dtype=np.float64)
-
+    # v_part[i] = sum_{j=j0..j1-1} A[i,j]*u[j], colonnes locales générées par tuiles
     t0 = time()
-    for i in range(N):
-        # on calcule seulement les colonnes locales
-        for j in range(j0, j1):
-            Aij = ((i + j) % N) + 1.0
-            v_part[i] += Aij * u[j]
+    v_part = local_matvec(N, 0, N, j0, j1, u[j0:j1])
+    t_comp = time()
 
     # Somme globale des contributions partielles -> v complet
     v = np.zeros(N, dtype=np.float64)
     comm.Allreduce(v_part, v, op=MPI.SUM)
     t1 = time()
 
+    t_comp_max = comm.reduce(t_comp - t0, op=MPI.MAX, root=0)
     if rank == 0:
-        print(f"[Colonnes] N={N}, np={size}, Nloc={Nloc}, time={t1-t0:.6f}s")
+        print(f"[Colonnes] N={N}, np={size}, Nloc={Nloc}, time={t1-t0:.6f}s "
+              f"(calcul max {t_comp_max:.6f}s, communication {t1-t_comp:.6f}s)")
         print("v =", v)
 
 if __name__ == "__main__":
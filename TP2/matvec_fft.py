@@ -0,0 +1,56 @@
+# Produit matrice-vecteur structuré par FFT
+#
+# La matrice de test A[i,j] = ((i+j) % N) + 1 ne dépend que de (i+j) mod N :
+# A[i,j] = w[(i+j) % N] avec w[k] = k+1 (matrice "circulante de Hankel").
+# Le produit v[i] = sum_j w[(i+j) % N] u[j] est alors une corrélation circulaire
+# de w et u, qui se calcule en O(N log N) :
+#     v = IFFT( FFT(w) * conj(FFT(u)) )      (u réel)
+# au lieu de O(N^2), et sans jamais former A (N = 10^7 ne tient pas en dense).
+import numpy as np
+
+
+class HankelCirculant:
+    """
+    Opérateur A[i,j] = w[(i+j) % N], défini par son vecteur générateur w (réel).
+    """
+    def __init__(self, w):
+        self.w = np.asarray(w, dtype=np.float64)
+        self.N = self.w.size
+        self._fw = None
+
+    @classmethod
+    def test_matrix(cls, N):
+        """
+        La matrice des scripts matvec*.py : A[i,j] = ((i+j) % N) + 1.
+        """
+        return cls(np.arange(1, N + 1, dtype=np.float64))
+
+    @classmethod
+    def from_dense(cls, A, rtol=0.0):
+        """
+        Reconnaît une matrice dense de cette famille : renvoie l'opérateur
+        correspondant, ou None si A[i,j] != A[0, (i+j) % N] pour un (i,j).
+        """
+        A = np.asarray(A, dtype=np.float64)
+        N = A.shape[0]
+        if A.shape != (N, N):
+            return None
+        w = A[0].copy()
+        idx = (np.arange(N)[:, None] + np.arange(N)[None, :]) % N
+        if not np.allclose(A, w[idx], rtol=rtol, atol=0.0):
+            return None
+        return cls(w)
+
+    def dense(self):
+        idx = (np.arange(self.N)[:, None] + np.arange(self.N)[None, :]) % self.N
+        return self.w[idx]
+
+    def row(self, i):
+        return np.roll(self.w, -i)
+
+    def matvec(self, u):
+        # FFT de w calculée une fois et réutilisée pour les produits suivants
+        if self._fw is None:
+            self._fw = np.fft.rfft(self.w)
+        fu = np.fft.rfft(np.asarray(u, dtype=np.float64))
+        return np.fft.irfft(self._fw * np.conj(fu), n=self.N)
@@ -0,0 +1,163 @@
+from mpi4py import MPI
+import numpy as np
+import argparse
+from math import isqrt
+from time import time
+from matvec_fft import HankelCirculant
+from matvec_kernel import local_matvec, split_rows
+
+# Produit v = A.u par FFT (voir matvec_fft.py), distribué entre les rangs.
+#
+# u, w et v sont répartis par blocs contigus de N/size éléments. La FFT de
+# taille N = N1*N2 est découpée en "quatre étapes" (Cooley-Tukey) :
+#   1. le bloc local est vu comme une matrice (N2/size) x N1 : x[n1 + N1*n2] ;
+#      transposition globale (Alltoall) -> N1/size lignes n1, toutes les colonnes n2
+#   2. FFT de taille N2 sur chaque ligne, puis facteurs de rotation exp(-2i.pi.n1.k2/N)
+#   3. transposition globale -> N2/size lignes k2, toutes les colonnes n1
+#   4. FFT de taille N1 sur chaque ligne : X[k2 + N2*k1]
+# Le spectre reste réparti dans cet ordre "transposé", ce qui suffit ici : le
+# produit FFT(w)*conj(FFT(u)) se fait terme à terme, et la FFT inverse refait
+# les quatre étapes à l'envers, v revenant dans la répartition par blocs de u.
+# Il faut N1 et N2 divisibles par size ; sinon chaque rang fait la FFT complète.
+
+
+def fft_factors(N, size):
+    """
+    Factorisation N = N1*N2 avec N1, N2 divisibles par size, N1 <= N2 le plus
+    proche possible de sqrt(N). Renvoie None si elle n'existe pas.
+    """
+    best = None
+    for n1 in range(size, isqrt(N) + 1, size):
+        if N % n1 == 0 and (N // n1) % size == 0:
+            best = n1
+    return None if best is None else (best, N // best)
+
+
+def transpose(comm, local, ncols):
+    """
+    Transposition globale : local est (a_loc, ncols), les lignes étant réparties
+    par blocs entre les rangs. Renvoie (ncols/size, a_loc*size).
+    """
+    size = comm.Get_size()
+    a_loc = local.shape[0]
+    b_loc = ncols // size
+    send = np.ascontiguousarray(local.reshape(a_loc, size, b_loc).transpose(1, 0, 2))
+    recv = np.empty_like(send)
+    comm.Alltoall(send, recv)
+    # recv[q] : lignes du rang q, colonnes de mon bloc
+    return np.ascontiguousarray(recv.transpose(2, 0, 1).reshape(b_loc, size * a_loc))
+
+
+class DistributedFFT:
+    def __init__(self, comm, N):
+        self.comm = comm
+        self.N = N
+        size, rank = comm.Get_size(), comm.Get_rank()
+        self.factors = fft_factors(N, size) if size > 1 else (1, N)
+        counts, disp = split_rows(N, size)
+        self.counts, self.disp = counts, disp
+        if self.factors is not None and size > 1:
+            N1, N2 = self.factors
+            n1 = np.arange(rank * (N1 // size), (rank + 1) * (N1 // size))
+            self.twiddle = np.exp(-2j * np.pi * np.outer(n1, np.arange(N2)) / N)
+
+    def forward(self, x_local):
+        size = self.comm.Get_size()
+        if size == 1:
+            return np.fft.fft(x_local)
+        if self.factors is None:
+            return self._full(x_local, np.fft.fft)
+        N1, N2 = self.factors
+        m = transpose(self.comm, x_local.astype(np.complex128).reshape(N2 // size, N1), N1)
+        m = np.fft.fft(m, axis=1)
+        m *= self.twiddle
+        m = transpose(self.comm, m, N2)
+        return np.fft.fft(m, axis=1)
+
+    def inverse(self, X):
+        size = self.comm.Get_size()
+        if size == 1:
+            return np.fft.ifft(X)
+        if self.factors is None:
+            return self._full(X, np.fft.ifft)
+        N1, N2 = self.factors
+        m = np.fft.ifft(X, axis=1)
+        m = transpose(self.comm, m, N1)
+        m *= np.conj(self.twiddle)
+        m = np.fft.ifft(m, axis=1)
+        return transpose(self.comm, m, N2).reshape(-1)
+
+    def _full(self, x_local, fft):
+        # Repli : on rassemble le vecteur, chaque rang fait la FFT et garde son bloc
+        x = np.empty(self.N, dtype=np.complex128)
+        self.comm.Allgatherv(x_local.astype(np.complex128),
+                             [x, self.counts, self.disp, MPI.DOUBLE_COMPLEX])
+        r = self.comm.Get_rank()
+        return fft(x)[self.disp[r]:self.disp[r] + self.counts[r]]
+
+
+def distributed_matvec(dfft, w_local, u_local):
+    """
+    v = A.u pour A[i,j] = w[(i+j) % N] ; w, u et v répartis par blocs.
+    """
+    spectrum = dfft.forward(w_local)
+    spectrum *= np.conj(dfft.forward(u_local))
+    return dfft.inverse(spectrum).real
+
+
+def main():
+    comm = MPI.COMM_WORLD
+    rank = comm.Get_rank()
+    size = comm.Get_size()
+
+    parser = argparse.ArgumentParser(description="Produit matrice-vecteur circulant par FFT (MPI)")
+    parser.add_argument("sizes", nargs="*", type=int, default=[120, 4096, 20000, 10**6, 10**7])
+    parser.add_argument("--dense-max", type=int, default=20000,
+                        help="taille maximale pour laquelle on calcule aussi le produit dense")
+    args = parser.parse_args()
+
+    for N in args.sizes:
+        dfft = DistributedFFT(comm, N)
+        i0 = dfft.disp[rank]
+        i1 = i0 + dfft.counts[rank]
+        w_local = np.arange(i0 + 1, i1 + 1, dtype=np.float64)
+        u_local = np.arange(i0 + 1, i1 + 1, dtype=np.float64)
+
+        comm.Barrier()
+        t0 = time()
+        v_local = distributed_matvec(dfft, w_local, u_local)
+        comm.Barrier()
+        t_dist = time() - t0
+
+        # Vérification : produit dense (tuilé) si N est petit, sinon quelques lignes exactes
+        op = HankelCirculant.test_matrix(N)
+        u = np.arange(1, N + 1, dtype=np.float64)
+        t_dense = None
+        if N <= args.dense_max:
+            t0 = time()
+            ref = local_matvec(N, i0, i1, 0, N, u)
+            t_dense = comm.allreduce(time() - t0, op=MPI.MAX)
+            err = np.abs(v_local - ref).max() / np.abs(ref).max()
+        else:
+            rows = range(i0, i1, max(1, (i1 - i0) // 3))
+            err = max(abs(v_local[i - i0] - op.row(i).dot(u)) / abs(op.row(i).dot(u)) for i in rows)
+        err = comm.allreduce(err, op=MPI.MAX)
+
+        t_seq = None
+        if rank == 0:
+            t0 = time()
+            op.matvec(u)
+            t_seq = time() - t0
+            dense_txt = f", dense {t_dense:.4f}s" if t_dense is not None else ", dense non calculé"
+            if size == 1:
+                mode = "FFT locale"
+            elif dfft.factors is not None:
+                mode = "FFT 4 étapes {}x{}".format(*dfft.factors)
+            else:
+                mode = "repli FFT complète"
+            print(f"N={N:>9d}, np={size}: FFT distribuée {t_dist:.4f}s ({mode}), "
+                  f"FFT séquentielle {t_seq:.4f}s{dense_txt}, erreur relative {err:.1e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+# Noyau local du produit matrice-vecteur v = A.u, commun aux scripts matvec_*_mpi.py
+#
+# La matrice de test est A[i,j] = ((i+j) % N) + 1. Elle n'est jamais stockée :
+# le bloc local (lignes ou colonnes d'un rang) est généré à la volée par tuiles
+# de TILE x TILE réels (2 Mo, de l'ordre du cache), et chaque tuile est
+# multipliée par le morceau de u correspondant avec le produit BLAS (np.dot).
+# La mémoire reste bornée même pour N ~ 10^5.
+import numpy as np
+
+TILE = 512
+
+
+def matrix_tile(N, i0, i1, j0, j1, out=None, mask=None):
+    """
+    A[i0:i1, j0:j1] en float64, écrit dans out si donné (tableau contigu
+    d'au moins (i1-i0)*(j1-j0) éléments ; mask : tampon booléen de même taille).
+    """
+    n = (i1 - i0) * (j1 - j0)
+    if out is None:
+        out = np.empty(n, dtype=np.float64)
+    if mask is None:
+        mask = np.empty(n, dtype=bool)
+    tile = out[:n].reshape(i1 - i0, j1 - j0)
+    wrap = mask[:n].reshape(i1 - i0, j1 - j0)
+    # (i+j) % N + 1 = i+j+1, moins N si i+j >= N (car i+j < 2N) ; tout en place
+    np.add.outer(np.arange(i0 + 1, i1 + 1, dtype=np.float64), np.arange(j0, j1, dtype=np.float64), out=tile)
+    np.greater(tile, N, out=wrap)
+    np.subtract(tile, N, out=tile, where=wrap)
+    return tile
+
+
+def local_matvec(N, i0, i1, j0, j1, u_local, tile=TILE, out=None):
+    """
+    Produit A[i0:i1, j0:j1] . u_local, avec u_local = u[j0:j1].
+    Le résultat (taille i1-i0) est écrit dans out si donné.
+    """
+    if out is None:
+        out = np.zeros(i1 - i0, dtype=np.float64)
+    else:
+        out[:] = 0.0
+    buf = np.empty(tile * tile, dtype=np.float64)
+    mask = np.empty(tile * tile, dtype=bool)
+    for ti in range(i0, i1, tile):
+        ti1 = min(ti + tile, i1)
+        acc = out[ti - i0:ti1 - i0]
+        for tj in range(j0, j1, tile):
+            tj1 = min(tj + tile, j1)
+            block = matrix_tile(N, ti, ti1, tj, tj1, out=buf, mask=mask)
+            acc += block.dot(u_local[tj - j0:tj1 - j0])
+    return out
+
+
+def split_rows(n: int, size: int):
+    """
+    Découpage de n lignes (ou colonnes) en size morceaux : les rem premiers
+    rangs ont une ligne de plus. Renvoie (counts, disp) comme dans game_of_life_par.py.
+    """
+    base = n // size
+    rem = n % size
+    counts = [base + (1 if r < rem else 0) for r in range(size)]
+    disp = [0] * size
+    acc = 0
+    for r in range(size):
+        disp[r] = acc
+        acc += counts[r]
+    return counts, disp
@@ -1,40 +1,42 @@
 from mpi4py import MPI
 import numpy as np
+import sys
 from time import time
+from matvec_kernel import local_matvec, split_rows
 
 def main():
     comm = MPI.COMM_WORLD
     rank = comm.Get_rank()
     size = comm.Get_size()
 
-    N = 120
-    assert N % size == 0, "N doit être divisible par le nombre de processus"
+    # Dimension (modifiable en argument, jusqu'à ~10^5)
+    N = int(sys.argv[1]) if len(sys.argv) > 1 else 120
 
-    Nloc = N // size
-    i0 = rank * Nloc
+    # Blocs de lignes éventuellement inégaux (les premiers rangs ont une ligne de plus)
+    counts, disp = split_rows(N, size)
+    Nloc = counts[rank]
+    i0 = disp[rank]
     i1 = i0 + Nloc
 
-    # u complet sur tous les processus
+    # u complet sur tous les processus, v préalloué (rempli par Allgatherv)
     u = np.arange(1, N + 1, dtype=np.float64)
+    v = np.empty(N, dtype=np.float64)
+    v_local = np.empty(Nloc, dtype=np.float64)
 
-    # Chaque processus calcule seulement v_local (taille Nloc)
-    v_local = np.zeros(Nloc, dtype=np.float64)
-
+    # Chaque processus calcule seulement v_local (taille Nloc), les lignes
+    # i0..i1-1 de A étant générées par tuiles (voir matvec_kernel.py)
     t0 = time()
-    for local_i, i in enumerate(range(i0, i1)):
-        s = 0.0
-        for j in range(N):
-            Aij = ((i + j) % N) + 1.0
-            s += Aij * u[j]
-        v_local[local_i] = s
-
-    # Rassembler tous les morceaux pour reconstruire v complet partout
-    v_parts = comm.allgather(v_local)   # liste de tableaux
-    v = np.concatenate(v_parts)
+    local_matvec(N, i0, i1, 0, N, u, out=v_local)
+    t_comp = time()
+
+    # Rassembler tous les morceaux directement à leur place dans v, partout
+    comm.Allgatherv(v_local, [v, counts, disp, MPI.DOUBLE])
     t1 = time()
 
+    t_comp_max = comm.reduce(t_comp - t0, op=MPI.MAX, root=0)
     if rank == 0:
-        print(f"[Lignes] N={N}, np={size}, Nloc={Nloc}, time={t1-t0:.6f}s")
+        print(f"[Lignes] N={N}, np={size}, Nloc={Nloc}, time={t1-t0:.6f}s "
+              f"(calcul max {t_comp_max:.6f}s, communication {t1-t_comp:.6f}s)")
         print("v =", v)
 
 if __name__ == "__main__":
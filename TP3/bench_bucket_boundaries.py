@@ -0,0 +1,81 @@
+from mpi4py import MPI
+import numpy as np
+import argparse
+from bucket_sort import bucket_sizes, bucket_sort_seq_np, quantile_boundaries, sample_sort
+
+# Seaux de même largeur contre seaux aux quantiles, sur des données plus ou
+# moins asymétriques :
+#   - séquentiel (rang 0) : bucket_sort_seq_np avec les intervalles de même
+#     largeur de bucket_id ou les bornes de quantile_boundaries ;
+#   - parallèle : sample_sort avec des séparateurs de même largeur ("width")
+#     ou échantillonnés ("sample"), un seau par rang.
+# L'équilibre est mesuré par max/moyenne des tailles de seaux (1 = parfait) ;
+# on garde le meilleur temps sur `reps` répétitions (max sur les rangs).
+#
+# Usage : mpirun -np 4 python bench_bucket_boundaries.py [--n 1000000] [--buckets 16]
+
+DISTRIBUTIONS = {
+    "uniform": lambda rng, n: rng.random(n),
+    "normal": lambda rng, n: rng.normal(size=n),
+    "exponential": lambda rng, n: rng.exponential(size=n),
+    "zipf": lambda rng, n: rng.zipf(1.5, size=n).astype(np.float64),
+}
+
+
+def imbalance(sizes):
+    sizes = np.asarray(sizes)
+    return sizes.max() / sizes.mean()
+
+
+def best_time(comm, fn, reps):
+    best = float("inf")
+    for _ in range(reps):
+        comm.Barrier()
+        t0 = MPI.Wtime()
+        res = fn()
+        best = min(best, comm.allreduce(MPI.Wtime() - t0, op=MPI.MAX))
+    return best, res
+
+
+def main():
+    comm = MPI.COMM_WORLD
+    rank = comm.Get_rank()
+    size = comm.Get_size()
+
+    parser = argparse.ArgumentParser(description="Seaux de même largeur contre seaux aux quantiles")
+    parser.add_argument("--n", type=int, default=1_000_000, help="nombre d'éléments par rang")
+    parser.add_argument("--buckets", type=int, default=16, help="nombre de seaux (séquentiel)")
+    parser.add_argument("--reps", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    b = args.buckets
+    rng = np.random.default_rng(np.random.SeedSequence(args.seed).spawn(size)[rank])
+
+    if rank == 0:
+        print(f"n={args.n} par rang, np={size}, {b} seaux en séquentiel")
+        print(f"{'distribution':>12s} {'mode':>12s} {'schéma':>9s} {'max/moy':>9s} {'temps (s)':>10s}  tailles")
+    for name, draw in DISTRIBUTIONS.items():
+        local = draw(rng, args.n)
+
+        if rank == 0:
+            for scheme in ("width", "quantile"):
+                t0 = MPI.Wtime()
+                bounds = quantile_boundaries(local, b, rng=rng) if scheme == "quantile" else None
+                t_bounds = MPI.Wtime() - t0
+                sizes = bucket_sizes(local, b, bounds)
+                t, res = best_time(MPI.COMM_SELF, lambda: bucket_sort_seq_np(local, b, bounds), args.reps)
+                assert np.array_equal(res, np.sort(local))
+                print(f"{name:>12s} {'séquentiel':>12s} {scheme:>9s} {imbalance(sizes):9.2f} "
+                      f"{t + t_bounds:10.4f}  {sizes.tolist()}")
+
+        if size > 1:
+            for scheme in ("width", "sample"):
+                t, out = best_time(comm, lambda: sample_sort(local, comm, splitters=scheme), args.reps)
+                sizes = comm.gather(out.size, root=0)
+                if rank == 0:
+                    print(f"{name:>12s} {'parallèle':>12s} {scheme:>9s} {imbalance(sizes):9.2f} "
+                          f"{t:10.4f}  {sizes}")
+
+
+if __name__ == "__main__":
+    main()
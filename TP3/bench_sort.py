@@ -0,0 +1,133 @@
+from mpi4py import MPI
+import numpy as np
+import argparse
+import csv
+import json
+import sys
+from bucket_sort import bucket_sort_seq_np, sample_sort
+from bench_bucket_boundaries import DISTRIBUTIONS
+
+# Banc d'essai des tris de bucket_sort.py, pour les courbes de passage à l'échelle :
+#   - taille n = 10^min_exp ... 10^max_exp, totale (--scaling strong) ou par rang (weak) ;
+#   - nombre de rangs : sous-communicateurs des p premiers rangs, p dans --ranks ;
+#   - distribution des données (voir bench_bucket_boundaries.py) ;
+#   - nombre de seaux pour le tri séquentiel (p = 1) ; en parallèle, un seau par rang (sample_sort).
+# Chaque phase (bucketing, comm, local_sort, merge) est chronométrée séparément ;
+# pour chaque configuration on garde la répétition la plus rapide, chaque temps
+# étant le maximum sur les rangs. Le résultat est comparé à np.sort (rassemblé
+# sur un rang si n <= --check-max, sinon vérification distribuée : morceaux
+# triés et ordonnés entre rangs, même nombre d'éléments et même somme).
+#
+# Usage : mpirun -np 8 python bench_sort.py --max-exp 8 --format csv -o resultats.csv
+
+PHASES = ("bucketing", "comm", "local_sort", "merge")
+
+
+def make_shard(distribution, n, comm, seed):
+    rank, size = comm.Get_rank(), comm.Get_size()
+    rng = np.random.default_rng(np.random.SeedSequence(seed).spawn(size)[rank])
+    return DISTRIBUTIONS[distribution](rng, n * (rank + 1) // size - n * rank // size)
+
+
+def check(comm, shard, out, check_max):
+    """
+    Vrai (sur tous les rangs) si les morceaux out forment le tri de la réunion des shard.
+    """
+    n = comm.allreduce(shard.size)
+    if n <= check_max:
+        full_in = comm.gather(shard, root=0)
+        full_out = comm.gather(out, root=0)
+        ok = None
+        if comm.Get_rank() == 0:
+            ok = bool(np.array_equal(np.sort(np.concatenate(full_in)), np.concatenate(full_out)))
+        return comm.bcast(ok, root=0)
+    ends = comm.allgather((out[0], out[-1]) if out.size else None)
+    ends = [e for e in ends if e is not None]
+    ordered = all(a[1] <= b[0] for a, b in zip(ends, ends[1:]))
+    local_ok = bool(np.all(out[1:] >= out[:-1]))
+    sums = np.empty(3)
+    comm.Allreduce(np.array([shard.sum(), out.sum(), out.size], dtype=np.float64), sums, op=MPI.SUM)
+    return (comm.allreduce(local_ok, op=MPI.LAND) and ordered and sums[2] == n
+            and np.isclose(sums[0], sums[1], rtol=1e-9))
+
+
+def run(comm, shard, buckets, reps):
+    """
+    Meilleure des reps exécutions : (temps total, temps par phase, résultat local).
+    """
+    best = None
+    for _ in range(reps):
+        timings = dict.fromkeys(PHASES, 0.0)
+        comm.Barrier()
+        t0 = MPI.Wtime()
+        if comm.Get_size() == 1:
+            out = bucket_sort_seq_np(shard, buckets, timings=timings)
+        else:
+            out = sample_sort(shard, comm, timings=timings)
+        total = comm.allreduce(MPI.Wtime() - t0, op=MPI.MAX)
+        phases = np.empty(len(PHASES))
+        comm.Allreduce(np.array([timings[p] for p in PHASES]), phases, op=MPI.MAX)
+        if best is None or total < best[0]:
+            best = (total, dict(zip(PHASES, phases.tolist())), out)
+    return best
+
+
+def main():
+    comm = MPI.COMM_WORLD
+    rank = comm.Get_rank()
+    size = comm.Get_size()
+
+    parser = argparse.ArgumentParser(description="Banc d'essai des tris par seaux (MPI)")
+    parser.add_argument("--min-exp", type=int, default=4)
+    parser.add_argument("--max-exp", type=int, default=8)
+    parser.add_argument("--scaling", choices=("strong", "weak"), default="strong",
+                        help="n total (strong) ou n par rang (weak)")
+    parser.add_argument("--ranks", type=int, nargs="*", default=None,
+                        help="nombres de rangs à tester (défaut : puissances de 2 et np)")
+    parser.add_argument("--buckets", type=int, nargs="*", default=[4, 16, 64],
+                        help="nombres de seaux du tri séquentiel")
+    parser.add_argument("--distributions", nargs="*", choices=sorted(DISTRIBUTIONS), default=["uniform"])
+    parser.add_argument("--reps", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--check-max", type=int, default=10**7,
+                        help="au-delà, vérification distribuée au lieu de np.sort")
+    parser.add_argument("--format", choices=("csv", "json"), default="csv")
+    parser.add_argument("-o", "--output", default=None, help="fichier de sortie (défaut : sortie standard)")
+    args = parser.parse_args()
+
+    ranks = args.ranks or sorted({p for p in (2**k for k in range(size.bit_length())) if p <= size} | {size})
+    rows = []
+    for p in ranks:
+        sub = comm.Split(0 if rank < p else MPI.UNDEFINED, rank)
+        if sub != MPI.COMM_NULL:
+            for distribution in args.distributions:
+                for e in range(args.min_exp, args.max_exp + 1):
+                    n = 10**e * (p if args.scaling == "weak" else 1)
+                    shard = make_shard(distribution, n, sub, args.seed)
+                    for b in (args.buckets if p == 1 else [p]):
+                        total, phases, out = run(sub, shard, b, args.reps)
+                        ok = check(sub, shard, out, args.check_max)
+                        del out
+                        if rank == 0:
+                            rows.append({"algorithm": "bucket_sort_seq_np" if p == 1 else "sample_sort",
+                                         "distribution": distribution, "scaling": args.scaling,
+                                         "n": n, "n_per_rank": n // p, "ranks": p, "buckets": b,
+                                         "time": total, **phases, "ok": ok})
+            sub.Free()
+        comm.Barrier()
+
+    if rank == 0:
+        out = open(args.output, "w", newline="") if args.output else sys.stdout
+        if args.format == "json":
+            json.dump(rows, out, indent=1)
+            out.write("\n")
+        else:
+            writer = csv.DictWriter(out, fieldnames=list(rows[0]) if rows else [])
+            writer.writeheader()
+            writer.writerows(rows)
+        if args.output:
+            out.close()
+
+
+if __name__ == "__main__":
+    main()
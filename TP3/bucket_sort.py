@@ -1,9 +1,6 @@
 import numpy as np
 import mpi4py.MPI as MPI
 
-globCom = MPI.COMM_WORLD.Dup()
-nbp = globCom.size
-rank = globCom.rank
 
 def bucket_id(x, minimum, maximum, b):
     bid = int((x - minimum) / (maximum - minimum) * b)
@@ -25,78 +22,203 @@ def bucket_sort_seq(data, b):
         res.extend(buckets[i])
     return res
 
-def bucket_sort_par(data, b, comm):
-
-    if rank >= b:
-        return None
-    
-    if rank == 0:
-        minimum = float(np.min(data))
-        maximum = float(np.max(data))
-        buckets = [[] for _ in range(b)]
-        for x in data:
-            buckets[bucket_id(x, minimum, maximum, b)].append(float(x))
-        for i in range(1, b):
-            comm.send(buckets[i], dest=i, tag=0)
-    
-        local = buckets[0]
-        local.sort()
+def bucket_ids(data, minimum, maximum, b):
+    """
+    Version vectorisée de bucket_id : numéro de seau de chaque élément de data.
+    """
+    if maximum == minimum:
+        return np.zeros(len(data), dtype=np.intp)
+    ids = ((data - minimum) / (maximum - minimum) * b).astype(np.intp)
+    ids[ids == b] = b - 1
+    return ids
 
+
+SAMPLE_SIZE = 1 << 16
+
+
+def quantile_boundaries(data, b, sample_size=SAMPLE_SIZE, rng=None):
+    """
+    Bornes intérieures (b-1 valeurs croissantes) de b seaux de même effectif,
+    estimées par les quantiles k/b d'un échantillon aléatoire de data. Contrairement
+    aux intervalles de même largeur de bucket_id, elles suivent la distribution
+    des données (queues lourdes, valeurs concentrées).
+    """
+    data = np.asarray(data)
+    if data.size > sample_size:
+        rng = np.random.default_rng() if rng is None else rng
+        data = data[rng.integers(0, data.size, sample_size)]
+    return np.quantile(data, np.arange(1, b) / b)
+
+
+def assign_buckets(data, b, boundaries=None):
+    """
+    Numéro de seau de chaque élément : intervalles de même largeur sur
+    [min, max] si boundaries vaut None, sinon seau k = ]boundaries[k-1], boundaries[k]].
+    """
+    if boundaries is None:
+        return bucket_ids(data, float(np.min(data)), float(np.max(data)), b)
+    return np.searchsorted(boundaries, data, side="left")
+
+
+def bucket_sizes(data, b, boundaries=None):
+    """
+    Nombre d'éléments de chaque seau.
+    """
+    return np.bincount(assign_buckets(data, b, boundaries), minlength=b)
+
+
+def _lap(timings, phase, t0):
+    # Ajoute le temps écoulé depuis t0 à timings[phase] (si timings est donné) ; renvoie l'instant courant
+    t1 = MPI.Wtime()
+    if timings is not None:
+        timings[phase] = timings.get(phase, 0.0) + t1 - t0
+    return t1
+
+
+def bucket_sort_seq_np(data, b, boundaries=None, timings=None):
+    """
+    Même tri que bucket_sort_seq, sur tableaux numpy : numéros de seaux
+    vectorisés, regroupement par seau façon tri par comptage (bincount +
+    décalages), tri de chaque seau en place dans un unique tableau de sortie.
+    boundaries : bornes des seaux (voir quantile_boundaries) au lieu des
+    intervalles de même largeur. timings : dictionnaire où cumuler les temps
+    des phases "bucketing" et "local_sort".
+    """
+    t0 = MPI.Wtime()
+    data = np.asarray(data, dtype=np.float64)
+    ids = assign_buckets(data, b, boundaries)
+    counts = np.bincount(ids, minlength=b)
+    offsets = np.zeros(b + 1, dtype=np.intp)
+    np.cumsum(counts, out=offsets[1:])
+    res = data[np.argsort(ids, kind="stable")]
+    t0 = _lap(timings, "bucketing", t0)
+    for i in range(b):
+        res[offsets[i]:offsets[i + 1]].sort()
+    _lap(timings, "local_sort", t0)
+    return res
+
+
+OVERSAMPLING = 4
+
+
+def _width_cuts(local, comm):
+    # local est trié ; bornes de size intervalles de même largeur sur [min, max] global
+    size = comm.Get_size()
+    lo = float(local[0]) if local.size else np.inf
+    hi = float(local[-1]) if local.size else -np.inf
+    lo, hi = comm.allreduce(lo, op=MPI.MIN), comm.allreduce(hi, op=MPI.MAX)
+    cuts = np.zeros(size + 1, dtype=np.intp)
+    if lo > hi:
+        # Entrée globale vide
+        return cuts
+    cuts[-1] = local.size
+    cuts[1:-1] = np.searchsorted(local, lo + (hi - lo) * np.arange(1, size) / size, side="left")
+    return cuts
+
+
+def _sample_cuts(local, comm, oversampling):
+    # local est trié ; voir sample_sort
+    size, rank = comm.Get_size(), comm.Get_rank()
+    # Échantillons réguliers du morceau trié (moins s'il est trop petit). Chaque
+    # échantillon est repéré par (valeur, rang, position) : cet ordre total
+    # départage les valeurs égales, qui peuvent ainsi être réparties entre rangs.
+    s = min(size * oversampling, local.size)
+    pos = (np.arange(s, dtype=np.int64) * local.size) // s
+    scounts = np.array(comm.allgather(s))
+    values = np.empty(scounts.sum(), dtype=local.dtype)
+    owners = np.empty((scounts.sum(), 2), dtype=np.int64)
+    comm.Allgatherv(local[pos], [values, scounts])
+    comm.Allgatherv(np.column_stack((np.full(s, rank, dtype=np.int64), pos)), [owners, 2 * scounts])
+    cuts = np.zeros(size + 1, dtype=np.intp)
+    if values.size == 0:
+        return cuts
+    order = np.lexsort((owners[:, 1], owners[:, 0], values))
+    pick = order[(np.arange(1, size) * values.size) // size]
+
+    # Morceau destiné au rang q : local[cuts[q]:cuts[q+1]], contigu car local est
+    # trié ; parmi les valeurs égales au séparateur (v, r, i), on garde celles
+    # qui le précèdent dans l'ordre (valeur, rang, position)
+    cuts[-1] = local.size
+    left = np.searchsorted(local, values[pick], side="left")
+    right = np.searchsorted(local, values[pick], side="right")
+    r, i = owners[pick, 0], owners[pick, 1]
+    cuts[1:-1] = np.where(r < rank, left, np.where(r > rank, right, i + 1))
+    return cuts
+
+
+def sample_sort(local, comm, oversampling=OVERSAMPLING, splitters="sample", timings=None):
+    """
+    Tri par échantillonnage régulier, entièrement distribué : chaque rang
+    fournit son morceau local (tableau numpy) et récupère un morceau trié,
+    les morceaux des rangs 0, 1, ..., size-1 mis bout à bout formant le
+    tableau global trié.
+
+    Chaque rang trie son morceau et en extrait size*oversampling échantillons
+    régulièrement espacés ; les size-1 séparateurs sont pris à intervalles
+    réguliers dans l'ensemble trié des échantillons. Le suréchantillonnage
+    resserre les séparateurs autour des quantiles et équilibre les tailles
+    même pour des données très asymétriques ou avec beaucoup de doublons.
+
+    splitters="width" remplace les séparateurs échantillonnés par les bornes
+    d'intervalles de même largeur sur [min, max] global, comme bucket_id
+    (pour comparaison, voir bench_bucket_boundaries.py).
+
+    timings : dictionnaire où cumuler les temps des phases "local_sort",
+    "bucketing" (choix des séparateurs et découpage), "comm" (échanges) et
+    "merge" (fusion des morceaux reçus).
+    """
+    size = comm.Get_size()
+    t0 = MPI.Wtime()
+    local = np.sort(np.asarray(local))
+    t0 = _lap(timings, "local_sort", t0)
+    if size == 1:
+        return local
+    if splitters == "width":
+        cuts = _width_cuts(local, comm)
     else:
-        local = comm.recv(source=0, tag=0)
-        local.sort()
-        comm.send(local, dest=0, tag=1)
-    
-    if rank == 0:
-        result = []
-        result.extend(local)
-        for p in range(1, b):
-            result.extend(comm.recv(source=p, tag=1))
-        return result
-    
-def demo_print():
-    if rank == 0:
-        data = np.random.default_rng(0).random(20)
-    else:
-        data = None
-
-    bucket_values = [b for b in [4, 8, 16, 32] if b <= nbp]
-
-    seq_times = {}
-    par_times = {}
-    seq_results = {}
-    par_results = {}
-
-    for b in bucket_values:
-        if rank == 0:
-            t0 = MPI.Wtime()
-            seq_results[b] = bucket_sort_seq(data, b=b)
-            t1 = MPI.Wtime()
-            seq_times[b] = t1 - t0
-
-        globCom.barrier()
-        t0 = MPI.Wtime()
-        par_res = bucket_sort_par(data, b, globCom)
-        globCom.barrier()
-        t1 = MPI.Wtime()
-        if rank == 0:
-            par_results[b] = par_res
-            par_times[b] = t1 - t0
-
-    if rank == 0:
-        print("Initial list:")
-        print(np.round(data, 4))
-        print()
-        for b in bucket_values:
-            print(f"Buckets: {b}")
-            print(f"  Seq time (s): {seq_times[b]:.6f}")
-            print(f"  Par time (s): {par_times[b]:.6f}")
-            print("  Seq result:")
-            print(np.round(seq_results[b], 4))
-            print("  Par result:")
-            print(np.round(par_results[b], 4))
-            print()
-        print()
-
-if __name__ == "__main__":
-    demo_print()
\ No newline at end of file
+        cuts = _sample_cuts(local, comm, oversampling)
+    t0 = _lap(timings, "bucketing", t0)
+
+    send_counts = np.diff(cuts).astype(np.int64)
+    recv_counts = np.empty(size, dtype=np.int64)
+    comm.Alltoall(send_counts, recv_counts)
+    recv_disp = np.zeros(size, dtype=np.int64)
+    np.cumsum(recv_counts[:-1], out=recv_disp[1:])
+
+    recv = np.empty(recv_counts.sum(), dtype=local.dtype)
+    comm.Alltoallv([local, (send_counts, cuts[:-1])], [recv, (recv_counts, recv_disp)])
+    t0 = _lap(timings, "comm", t0)
+    # recv est une suite de size morceaux triés : le tri stable (fusion) en profite
+    recv.sort(kind="stable")
+    _lap(timings, "merge", t0)
+    return recv
+
+
+def gather_sorted(local, comm, root=0):
+    """
+    Rassemble sur root les morceaux renvoyés par sample_sort (None ailleurs).
+    """
+    counts = comm.gather(local.size, root=root)
+    result = None
+    if comm.Get_rank() == root:
+        result = np.empty(sum(counts), dtype=local.dtype)
+    comm.Gatherv(local, [result, counts] if result is not None else None, root=root)
+    return result
+
+
+def bucket_sort_par(data, comm, root=0, gather=True):
+    """
+    data, présent sur root, est réparti par blocs entre les rangs, puis trié
+    par sample_sort. Renvoie le tableau trié sur root si gather (None ailleurs),
+    sinon le morceau trié local.
+    """
+    size, rank = comm.Get_size(), comm.Get_rank()
+    n = comm.bcast(len(data) if rank == root else None, root=root)
+    counts = [n // size + (1 if r < n % size else 0) for r in range(size)]
+    local = np.empty(counts[rank], dtype=np.float64)
+    send = [np.asarray(data, dtype=np.float64), counts] if rank == root else None
+    comm.Scatterv(send, local, root=root)
+    local = sample_sort(local, comm)
+    if gather:
+        return gather_sorted(local, comm, root=root)
+    return local
@@ -0,0 +1,338 @@
+from mpi4py import MPI
+import numpy as np
+import argparse
+import os
+import shutil
+import tempfile
+from collections import OrderedDict
+from bucket_sort import assign_buckets, quantile_boundaries, SAMPLE_SIZE
+
+# Tri par seaux hors mémoire : l'entrée est un fichier binaire brut (tableau
+# numpy sans en-tête) lu par morceaux via np.memmap, et la mémoire utilisée
+# reste bornée par `budget` octets quelle que soit la taille du fichier
+# (tableaux numpy ; les pages de fichiers en cache sont gérées par le système).
+#   1. bornes des seaux aux quantiles d'un échantillon aléatoire du fichier,
+#      assez de seaux pour que chacun tienne dans le budget, mais au plus
+#      max_fanout() par passe (descripteurs de fichiers) : les seaux restés trop
+#      gros sont redécoupés à l'étape 3 ;
+#   2. chaque rang lit sa part du fichier par morceaux et ajoute chaque
+#      morceau de seau à un fichier temporaire par (seau, rang), les fichiers
+#      restant ouverts d'un morceau à l'autre (BucketFiles) ;
+#   3. les seaux sont répartis par blocs contigus entre les rangs ; chaque rang
+#      relit ses seaux un par un, les trie en mémoire et les écrit à leur place
+#      dans le fichier de sortie, séquentiellement. Un seau trop gros (données
+#      très concentrées) est redécoupé de la même façon, récursivement.
+# Le répertoire temporaire et la sortie doivent être sur un système de fichiers
+# partagé par les rangs.
+#
+# Usage : mpirun -np 4 python bucket_sort_external.py entree.bin sortie.bin [--memory-mb 256]
+#         (--generate N crée d'abord une entrée aléatoire de N éléments)
+
+
+MAX_FANOUT = 256
+
+
+def max_fanout():
+    # Seaux par passe : au plus MAX_FANOUT, et la moitié de la limite de descripteurs du processus
+    try:
+        import resource
+        soft = resource.getrlimit(resource.RLIMIT_NOFILE)[0]
+    except ImportError:
+        return MAX_FANOUT
+    if soft == resource.RLIM_INFINITY:
+        return MAX_FANOUT
+    return max(2, min(MAX_FANOUT, soft // 2))
+
+
+class BucketFiles:
+    """
+    Fichiers de seaux ouverts en ajout, au plus max_open à la fois : quand il
+    faut en ouvrir un de plus, on ferme le moins récemment écrit.
+    """
+    def __init__(self, paths, max_open):
+        self.paths = paths
+        self.max_open = max_open
+        self._files = OrderedDict()
+
+    def write(self, k, block):
+        f = self._files.get(k)
+        if f is None:
+            if len(self._files) >= self.max_open:
+                self._files.popitem(last=False)[1].close()
+            f = self._files[k] = open(self.paths[k], "ab")
+        else:
+            self._files.move_to_end(k)
+        block.tofile(f)
+
+    def close(self):
+        for f in self._files.values():
+            f.close()
+        self._files.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class IOStats:
+    """
+    Octets lus et écrits et temps passé, par phase.
+    """
+    def __init__(self):
+        self.read = 0
+        self.written = 0
+        self.time = 0.0
+
+    def throughput(self):
+        return (self.read + self.written) / self.time / 2**20 if self.time > 0 else 0.0
+
+
+def spill_chunk(budget, itemsize):
+    # Éléments par morceau : pour chacun, le morceau lui-même, son numéro de seau (intp),
+    # la permutation qui range le morceau par seau (intp) et la copie permutée
+    return max(1, budget // (2 * itemsize + 2 * np.dtype(np.intp).itemsize))
+
+
+def spill(sources, boundaries, chunk, paths, stats):
+    """
+    Lit les tableaux sources (memmap) par morceaux de chunk éléments et ajoute
+    les éléments du seau k à la fin du fichier paths[k]. Renvoie l'effectif de chaque seau.
+    """
+    b = len(paths)
+    counts = np.zeros(b, dtype=np.int64)
+    with BucketFiles(paths, max_fanout()) as files:
+        for src in sources:
+            for i0 in range(0, src.size, chunk):
+                block = np.array(src[i0:i0 + chunk])
+                stats.read += block.nbytes
+                ids = assign_buckets(block, b, boundaries)
+                n = np.bincount(ids, minlength=b)
+                offsets = np.zeros(b + 1, dtype=np.intp)
+                np.cumsum(n, out=offsets[1:])
+                order = np.argsort(ids, kind="stable")
+                del ids
+                block = block[order]
+                del order
+                for k in np.flatnonzero(n):
+                    files.write(k, block[offsets[k]:offsets[k + 1]])
+                stats.written += block.nbytes
+                counts += n
+    return counts
+
+
+def sample_file(sources, rng, sample_size=SAMPLE_SIZE):
+    """
+    Échantillon aléatoire (au plus sample_size éléments) de la réunion des sources.
+    """
+    sizes = np.array([s.size for s in sources])
+    total = sizes.sum()
+    if total <= sample_size:
+        return np.concatenate([np.asarray(s) for s in sources])
+    idx = np.sort(rng.integers(0, total, sample_size))
+    starts = np.concatenate(([0], np.cumsum(sizes)))
+    return np.concatenate([np.asarray(s[idx[(idx >= a) & (idx < e)] - a])
+                           for s, a, e in zip(sources, starts[:-1], starts[1:])])
+
+
+def n_buckets(nbytes, budget, minimum=1, maximum=None):
+    # Seaux visés à la moitié du budget, pour absorber l'écart aux quantiles de l'échantillon
+    b = -(-2 * nbytes // budget)
+    if maximum is not None:
+        b = min(b, maximum)
+    return max(minimum, b)
+
+
+def sort_bucket(paths, dtype, out, offset, budget, tmpdir, rng, stats, depth=0):
+    """
+    Trie la réunion des fichiers paths (éléments de type dtype) et l'écrit dans
+    le fichier ouvert out à partir de l'élément offset. Renvoie le nombre d'éléments.
+    """
+    itemsize = np.dtype(dtype).itemsize
+    nbytes = sum(os.path.getsize(p) for p in paths)
+    n = nbytes // itemsize
+    if n == 0:
+        return 0
+    if nbytes <= budget:
+        # Lecture des morceaux directement à leur place dans un seul tableau
+        data = np.empty(n, dtype=dtype)
+        pos = 0
+        for p in paths:
+            m = os.path.getsize(p) // itemsize
+            with open(p, "rb") as f:
+                f.readinto(memoryview(data[pos:pos + m]).cast("B"))
+            pos += m
+        stats.read += nbytes
+        data.sort()
+        out.seek(offset * itemsize)
+        data.tofile(out)
+        stats.written += nbytes
+        return n
+
+    sources = [np.memmap(p, dtype=dtype, mode="r") for p in paths if os.path.getsize(p) > 0]
+    sample = sample_file(sources, rng)
+    lo, hi = sample.min(), sample.max()
+    if lo == hi and all(s.min() == s.max() == lo for s in sources):
+        # Seau constant : rien à trier
+        chunk = max(1, budget // itemsize)
+        out.seek(offset * itemsize)
+        for i0 in range(0, n, chunk):
+            np.full(min(chunk, n - i0), lo, dtype=dtype).tofile(out)
+        stats.read += nbytes
+        stats.written += nbytes
+        return n
+
+    # Seau trop gros : on le redécoupe aux quantiles de son propre échantillon.
+    # Chaque borne q est doublée de la valeur précédente, pour qu'une valeur
+    # très répétée forme un seau constant à elle seule : le découpage progresse toujours.
+    q = quantile_boundaries(sample, n_buckets(nbytes, budget, minimum=2, maximum=max_fanout() // 2))
+    if np.issubdtype(dtype, np.integer):
+        q = np.floor(q)
+        below = q - 1
+    else:
+        below = np.nextafter(q, -np.inf)
+    boundaries = np.unique(np.concatenate((below, q)))
+    b = boundaries.size + 1
+    sub = tempfile.mkdtemp(dir=tmpdir, prefix=f"split{depth}_")
+    sub_paths = [os.path.join(sub, f"{k}.bin") for k in range(b)]
+    counts = spill(sources, boundaries, spill_chunk(budget, itemsize), sub_paths, stats)
+    del sources
+    for k in range(b):
+        sort_bucket([sub_paths[k]], dtype, out, offset, budget, sub, rng, stats, depth + 1)
+        os.remove(sub_paths[k])
+        offset += counts[k]
+    shutil.rmtree(sub)
+    return n
+
+
+def external_sort(comm, input_path, output_path, dtype=np.float64, budget=256 * 2**20, tmpdir=None, seed=None):
+    """
+    Trie le fichier binaire input_path vers output_path (même type, même taille).
+    Renvoie les statistiques d'E/S locales des deux phases (répartition, tri).
+    """
+    rank, size = comm.Get_rank(), comm.Get_size()
+    dtype = np.dtype(dtype)
+    src = np.memmap(input_path, dtype=dtype, mode="r")
+    n = src.size
+    rng = np.random.default_rng(np.random.SeedSequence(seed).spawn(size)[rank])
+
+    # Bornes des seaux et répertoire temporaire, choisis par le rang 0
+    b = n_buckets(n * dtype.itemsize, budget, minimum=size, maximum=max_fanout())
+    boundaries = quantile_boundaries(sample_file([src], rng), b) if rank == 0 else None
+    boundaries = comm.bcast(boundaries, root=0)
+    work = tempfile.mkdtemp(dir=tmpdir, prefix="bucket_sort_") if rank == 0 else None
+    work = comm.bcast(work, root=0)
+    if rank == 0:
+        with open(output_path, "wb") as f:
+            f.truncate(n * dtype.itemsize)
+
+    # Phase 1 : chaque rang répartit sa part contiguë de l'entrée
+    spill_stats = IOStats()
+    t0 = MPI.Wtime()
+    i0, i1 = rank * n // size, (rank + 1) * n // size
+    paths = [os.path.join(work, f"{k}.{rank}.bin") for k in range(b)]
+    counts = spill([src[i0:i1]], boundaries, spill_chunk(budget, dtype.itemsize), paths, spill_stats)
+    spill_stats.time = MPI.Wtime() - t0
+    del src
+
+    # Effectifs globaux -> position de chaque seau dans la sortie
+    total = np.empty_like(counts)
+    comm.Allreduce(counts, total, op=MPI.SUM)
+    offsets = np.zeros(b + 1, dtype=np.int64)
+    np.cumsum(total, out=offsets[1:])
+
+    # Phase 2 : seaux k0..k1-1 pour ce rang, triés et écrits dans l'ordre
+    sort_stats = IOStats()
+    t0 = MPI.Wtime()
+    k0, k1 = rank * b // size, (rank + 1) * b // size
+    with open(output_path, "r+b") as out:
+        for k in range(k0, k1):
+            bucket = [os.path.join(work, f"{k}.{r}.bin") for r in range(size)]
+            sort_bucket(bucket, dtype, out, offsets[k], budget, work, rng, sort_stats)
+            for p in bucket:
+                os.remove(p)
+    sort_stats.time = MPI.Wtime() - t0
+
+    comm.Barrier()
+    if rank == 0:
+        shutil.rmtree(work)
+    return spill_stats, sort_stats
+
+
+def generate(comm, path, n, dtype, distribution, seed, chunk=1 << 22):
+    """
+    Écrit n éléments aléatoires dans path, chaque rang remplissant sa part.
+    """
+    rank, size = comm.Get_rank(), comm.Get_size()
+    if rank == 0:
+        with open(path, "wb") as f:
+            f.truncate(n * np.dtype(dtype).itemsize)
+    comm.Barrier()
+    rng = np.random.default_rng(np.random.SeedSequence(seed).spawn(size)[rank])
+    dst = np.memmap(path, dtype=dtype, mode="r+")
+    for i0 in range(rank * n // size, (rank + 1) * n // size, chunk):
+        m = min(chunk, (rank + 1) * n // size - i0)
+        block = rng.exponential(size=m) if distribution == "exponential" else rng.random(m)
+        dst[i0:i0 + m] = block
+    dst.flush()
+    del dst
+    comm.Barrier()
+
+
+def check_sorted(path, dtype, chunk=1 << 22):
+    data = np.memmap(path, dtype=dtype, mode="r")
+    last = None
+    for i0 in range(0, data.size, chunk):
+        block = np.asarray(data[i0:i0 + chunk])
+        if np.any(block[1:] < block[:-1]) or (last is not None and block.size and block[0] < last):
+            return False
+        if block.size:
+            last = block[-1]
+    return True
+
+
+def main():
+    comm = MPI.COMM_WORLD
+    rank = comm.Get_rank()
+    size = comm.Get_size()
+
+    parser = argparse.ArgumentParser(description="Tri par seaux hors mémoire (MPI)")
+    parser.add_argument("input", help="fichier binaire brut d'entrée")
+    parser.add_argument("output", help="fichier binaire brut de sortie")
+    parser.add_argument("--dtype", choices=("float32", "float64", "int32", "int64"), default="float64")
+    parser.add_argument("--memory-mb", type=int, default=256, help="budget mémoire par rang (Mo)")
+    parser.add_argument("--tmpdir", default=None, help="répertoire des fichiers temporaires (partagé)")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--generate", type=int, default=None, metavar="N",
+                        help="crée d'abord une entrée aléatoire de N éléments")
+    parser.add_argument("--distribution", choices=("uniform", "exponential"), default="uniform")
+    parser.add_argument("--check", action="store_true", help="vérifie que la sortie est triée")
+    args = parser.parse_args()
+    dtype = np.dtype(args.dtype)
+
+    if args.generate is not None:
+        generate(comm, args.input, args.generate, dtype, args.distribution, args.seed)
+
+    comm.Barrier()
+    t0 = MPI.Wtime()
+    spill_stats, sort_stats = external_sort(comm, args.input, args.output, dtype,
+                                            args.memory_mb * 2**20, args.tmpdir, args.seed)
+    elapsed = MPI.Wtime() - t0
+
+    stats = comm.gather((spill_stats, sort_stats), root=0)
+    if rank == 0:
+        nbytes = os.path.getsize(args.input)
+        print(f"{nbytes / 2**20:.1f} Mo triés en {elapsed:.3f}s (np={size}, budget {args.memory_mb} Mo/rang), "
+              f"{nbytes / elapsed / 2**20:.1f} Mo/s de bout en bout")
+        for r, (sp, so) in enumerate(stats):
+            print(f"  rang {r}: répartition {sp.time:.3f}s (lu {sp.read / 2**20:.1f} Mo, "
+                  f"écrit {sp.written / 2**20:.1f} Mo, {sp.throughput():.1f} Mo/s), "
+                  f"tri {so.time:.3f}s (lu {so.read / 2**20:.1f} Mo, "
+                  f"écrit {so.written / 2**20:.1f} Mo, {so.throughput():.1f} Mo/s)")
+        if args.check:
+            print("sortie triée :", check_sorted(args.output, dtype))
+
+
+if __name__ == "__main__":
+    main()
@@ -83,7 +83,7 @@ class Grille:
                 else:
                     next_cells[i,j] = 0         # Morte, elle reste morte.
         self.cells = next_cells
-        return diff_cells
+        return np.array(diff_cells, dtype=np.intp)
 
 
 class App:
@@ -91,7 +91,13 @@ class App:
     Cette classe décrit la fenêtre affichant la grille à l'écran
         - geometry est un tuple de deux entiers donnant le nombre de pixels verticaux et horizontaux (dans cet ordre)
         - grid est la grille décrivant l'automate cellulaire (voir plus haut)
+    draw(diff) ne repeint que les cellules modifiées (indices plats renvoyés par
+    compute_next_iteration) ; sans diff, ou s'il y en a trop, toute l'image est
+    construite d'un coup par pygame.surfarray puis agrandie et copiée à l'écran.
     """
+    # Au-delà de cette proportion de cellules modifiées, on repeint toute l'image
+    FULL_FRAME_FRACTION = 0.05
+
     def __init__(self, geometry, grid):
         self.grid = grid
         # Calcul de la taille d'une cellule par rapport à la taille de la fenêtre et de la grille à afficher :
@@ -106,8 +112,15 @@ class App:
         self.height= grid.dimensions[0] * self.size_y
         # Création de la fenêtre à l'aide de tkinter
         self.screen = pg.display.set_mode((self.width,self.height))
-        #
-        self.canvas_cells = []
+        # Couleurs (morte, vivante) en RGB pour surfarray
+        self.palette = np.array([tuple(pg.Color(grid.col_dead))[:3], tuple(pg.Color(grid.col_life))[:3]], dtype=np.uint8)
+        # Lignes de la grille dessinées une fois pour toutes sur une surface transparente
+        self.overlay = None
+        if self.draw_color is not None:
+            self.overlay = pg.Surface((self.width, self.height), pg.SRCALPHA)
+            [pg.draw.line(self.overlay, self.draw_color, (0,i*self.size_y), (self.width,i*self.size_y)) for i in range(grid.dimensions[0])]
+            [pg.draw.line(self.overlay, self.draw_color, (j*self.size_x,0), (j*self.size_x,self.height)) for j in range(grid.dimensions[1])]
+        self.drawn = False
 
     def compute_rectangle(self, i: int, j: int):
         """
@@ -121,12 +134,33 @@ class App:
         else:
             return self.grid.col_life
 
-    def draw(self):
-        [self.screen.fill(self.compute_color(i,j),self.compute_rectangle(i,j)) for i in range(self.grid.dimensions[0]) for j in range(self.grid.dimensions[1])]
-        if (self.draw_color is not None):
-            [pg.draw.line(self.screen, self.draw_color, (0,i*self.size_y), (self.width,i*self.size_y)) for i in range(self.grid.dimensions[0])]
-            [pg.draw.line(self.screen, self.draw_color, (j*self.size_x,0), (j*self.size_x,self.height)) for j in range(self.grid.dimensions[1])]
+    def draw_full(self):
+        """
+        Image complète : une surface d'un pixel par cellule (axes x, y de surfarray, ligne 0 en bas)
+        agrandie à la taille de la fenêtre, puis les lignes de la grille.
+        """
+        pixels = self.palette[self.grid.cells.T[:, ::-1]]
+        surface = pg.transform.scale(pg.surfarray.make_surface(pixels), (self.width, self.height))
+        self.screen.blit(surface, (0, 0))
+        if self.overlay is not None:
+            self.screen.blit(self.overlay, (0, 0))
         pg.display.update()
+        self.drawn = True
+
+    def draw(self, diff=None):
+        if diff is None or not self.drawn or len(diff) > self.FULL_FRAME_FRACTION * self.grid.cells.size:
+            self.draw_full()
+            return
+        nx = self.grid.dimensions[1]
+        rects = []
+        for k in diff.tolist():
+            i, j = divmod(k, nx)
+            rect = pg.Rect(self.compute_rectangle(i, j))
+            self.screen.fill(self.compute_color(i, j), rect)
+            if self.overlay is not None:
+                self.screen.blit(self.overlay, rect, area=rect)
+            rects.append(rect)
+        pg.display.update(rects)
 
 
 if __name__ == '__main__':
@@ -174,7 +208,7 @@ if __name__ == '__main__':
         t1 = time.time()
         diff = grid.compute_next_iteration()
         t2 = time.time()
-        appli.draw()
+        appli.draw(diff)
         t3 = time.time()
         for event in pg.event.get():
             if event.type == pg.QUIT:
@@ -0,0 +1,195 @@
+"""
+game_of_life_bits.py
+Jeu de la vie sur une grille "bit-packée"
+#########################################
+Même automate torique que game_of_life_vect.py, mais chaque ligne de la grille est
+stockée sur des mots de 64 bits (64 cellules par uint64 : bit b du mot w = colonne 64*w+b),
+soit 8 fois moins de mémoire et de bande passante qu'un octet par cellule.
+
+Le nombre de voisines vivantes n'est jamais calculé explicitement : il est
+représenté "en tranches de bits" (un tableau de mots par bit du compteur) et
+obtenu par des additionneurs binaires (xor / and / or) appliqués à 64 cellules
+à la fois :
+    - pour chaque ligne, somme horizontale gauche+centre+droite (0..3) sur deux
+      tranches (uns, deux), les décalages d'un bit se propageant d'un mot à
+      l'autre et la dernière colonne rebouclant sur la première (tore) ;
+    - les sommes des lignes du dessus et du dessous (np.roll sur les lignes)
+      et celle de la ligne courante sans la cellule centrale s'additionnent :
+      voisines = uns + 2*deux, avec uns dans {0,1} et deux = somme de quatre bits.
+Une cellule est vivante à la génération suivante ssi deux vaut exactement 1 et
+(uns vaut 1 ou la cellule est vivante) : 3 voisines, ou 2 voisines et vivante.
+
+BitGrille offre les mêmes attributs que Grille (dimensions, cells, col_life,
+col_dead, compute_next_iteration) : l'App de game_of_life_vect.py peut l'afficher,
+cells étant décodé (une fois par génération) en tableau uint8.
+
+Usage : python game_of_life_bits.py [taille ...] [--generations 20]   (banc d'essai)
+        python game_of_life_bits.py --display glider                  (affichage)
+"""
+import numpy as np
+
+
+def pack(cells):
+    """
+    Tableau (ny, nx) de 0/1 -> tableau (ny, ceil(nx/64)) de uint64.
+    """
+    ny, nx = cells.shape
+    nwords = -(-nx // 64)
+    padded = np.zeros((ny, nwords * 64), dtype=np.uint8)
+    padded[:, :nx] = cells
+    return np.packbits(padded, axis=1, bitorder="little").view("<u8").astype(np.uint64, copy=False)
+
+
+def unpack(words, nx):
+    """
+    Inverse de pack : tableau (ny, nx) de uint8.
+    """
+    bits = np.unpackbits(words.astype("<u8", copy=False).view(np.uint8), axis=1, bitorder="little")
+    return bits[:, :nx]
+
+
+class BitGrille:
+    """
+    Grille torique bit-packée (voir l'en-tête du module). Les paramètres sont
+    ceux de Grille dans game_of_life_vect.py ; from_cells construit la grille
+    à partir d'un tableau de cellules existant.
+    """
+    def __init__(self, dim, init_pattern=None, color_life="black", color_dead="white"):
+        self.dimensions = dim
+        if init_pattern is not None:
+            cells = np.zeros(dim, dtype=np.uint8)
+            cells[tuple(np.array(init_pattern, dtype=np.intp).reshape(-1, 2).T)] = 1
+        else:
+            cells = np.random.randint(2, size=dim, dtype=np.uint8)
+        self.col_life = color_life
+        self.col_dead = color_dead
+        self.words = pack(cells)
+        nx = dim[1]
+        # Bits de bourrage du dernier mot, toujours maintenus à 0
+        self.last_mask = np.uint64((1 << (nx % 64)) - 1) if nx % 64 else ~np.uint64(0)
+        self._cells = cells
+
+    @classmethod
+    def from_cells(cls, cells, color_life="black", color_dead="white"):
+        grid = cls(cells.shape, init_pattern=[], color_life=color_life, color_dead=color_dead)
+        grid.words = pack(cells)
+        grid._cells = np.asarray(cells, dtype=np.uint8)
+        return grid
+
+    @property
+    def cells(self):
+        if self._cells is None:
+            self._cells = unpack(self.words, self.dimensions[1])
+        return self._cells
+
+    def _shifted(self, x):
+        """
+        (gauche, droite) : pour chaque colonne j, la cellule de la colonne j-1
+        (resp. j+1) de la même ligne, avec rebouclage torique.
+        """
+        nx = self.dimensions[1]
+        one, top = np.uint64(1), np.uint64(63)
+        # Voisine de gauche : décalage vers les bits de poids fort, retenue du mot précédent
+        left = x << one
+        left[:, 1:] |= x[:, :-1] >> top
+        left[:, 0] |= (x[:, -1] >> np.uint64((nx - 1) % 64)) & one
+        # Voisine de droite : décalage vers les bits de poids faible, retenue du mot suivant
+        right = x >> one
+        right[:, :-1] |= x[:, 1:] << top
+        right[:, -1] |= (x[:, 0] & one) << np.uint64((nx - 1) % 64)
+        left[:, -1] &= self.last_mask
+        right[:, -1] &= self.last_mask
+        return left, right
+
+    def step(self):
+        """
+        Avance d'une génération (sans calcul des cellules modifiées).
+        """
+        x = self.words
+        left, right = self._shifted(x)
+        # Ligne courante, voisines gauche et droite : somme 0..2 = ones_m + 2*twos_m
+        ones_m = left ^ right
+        twos_m = left & right
+        # Somme horizontale gauche+centre+droite de chaque ligne : 0..3 = ones_h + 2*twos_h
+        ones_h = ones_m ^ x
+        twos_h = twos_m | (ones_m & x)
+        ones_u, twos_u = np.roll(ones_h, 1, axis=0), np.roll(twos_h, 1, axis=0)
+        ones_d, twos_d = np.roll(ones_h, -1, axis=0), np.roll(twos_h, -1, axis=0)
+        # Somme des trois chiffres des unités : uns + 2*retenue
+        ones = ones_u ^ ones_m ^ ones_d
+        carry = (ones_u & ones_m) | (ones_d & (ones_u ^ ones_m))
+        # deux = twos_u + twos_m + twos_d + carry : on veut savoir s'il vaut exactement 1
+        a, b = twos_u ^ twos_m, twos_d ^ carry
+        pairs = (twos_u & twos_m) | (twos_d & carry) | (a & b)
+        exactly_one = (a ^ b) & ~pairs
+        self.words = exactly_one & (ones | x)
+        self._cells = None
+
+    def compute_next_iteration(self):
+        """
+        Calcule la génération suivante ; renvoie les indices plats (i*nx+j) des cellules modifiées.
+        """
+        old = self.words
+        self.step()
+        return np.flatnonzero(unpack(old ^ self.words, self.dimensions[1]))
+
+
+def step_convolve(cells):
+    # Référence : génération suivante par convolution flottante (scipy), calcul historique de game_of_life_vect.py
+    from scipy.signal import convolve2d
+    C = np.ones((3, 3))
+    C[1, 1] = 0
+    voisins = convolve2d(cells, C, mode='same', boundary='wrap')
+    return ((voisins == 3) | ((cells == 1) & (voisins == 2))).astype(np.uint8)
+
+
+def benchmark(sizes, generations):
+    import time
+    for n in sizes:
+        cells = np.random.randint(2, size=(n, n), dtype=np.uint8)
+        grid = BitGrille.from_cells(cells)
+        t0 = time.time()
+        for _ in range(generations):
+            grid.step()
+        t_bits = time.time() - t0
+        line = (f"{n:>6d}x{n:<6d} bits : {generations / t_bits:9.2f} générations/s "
+                f"({cells.nbytes / grid.words.nbytes:.1f}x moins de mémoire)")
+        try:
+            t0 = time.time()
+            ref = cells
+            for _ in range(generations):
+                ref = step_convolve(ref)
+            t_conv = time.time() - t0
+            assert np.array_equal(ref, grid.cells)
+            line += f", convolve2d : {generations / t_conv:9.2f} générations/s, speedup {t_conv / t_bits:.1f}x"
+        except ImportError:
+            line += ", convolve2d : scipy absent"
+        print(line)
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Jeu de la vie bit-packé")
+    parser.add_argument("sizes", nargs="*", type=int, default=[256, 1000, 4000, 10000])
+    parser.add_argument("--generations", type=int, default=20)
+    parser.add_argument("--display", metavar="PATTERN", default=None,
+                        help="affiche un motif de game_of_life_vect.py avec son App")
+    args = parser.parse_args()
+
+    if args.display is None:
+        benchmark(args.sizes, args.generations)
+    else:
+        import pygame as pg
+        from game_of_life_vect import App, dico_patterns
+        pg.init()
+        grid = BitGrille(*dico_patterns[args.display], color_life=pg.Color("black"), color_dead=pg.Color("white"))
+        appli = App((800, 800), grid)
+        mustContinue = True
+        while mustContinue:
+            diff = grid.compute_next_iteration()
+            appli.draw(diff)
+            for event in pg.event.get():
+                if event.type == pg.QUIT:
+                    mustContinue = False
+        pg.quit()
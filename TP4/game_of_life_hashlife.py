@@ -0,0 +1,392 @@
+"""
+game_of_life_hashlife.py
+Jeu de la vie par l'algorithme Hashlife (Gosper)
+################################################
+L'univers est un arbre quaternaire : un noeud de niveau L représente un carré de
+2^L x 2^L cellules et a quatre fils de niveau L-1 (nw, ne, sw, se). Les feuilles
+(niveau 3) sont des blocs 8x8 codés sur les 64 bits d'un entier (bit 8*ligne+colonne).
+    - Les noeuds sont canoniques ("hash-consing") : deux carrés identiques sont
+      le même objet, ce qui comprime les motifs répétitifs dans l'espace.
+    - step(noeud, j) renvoie le carré central (niveau L-1) après 2^j générations,
+      pour j <= L-2 ; il est mémorisé dans le noeud, ce qui comprime le temps : un
+      motif déjà rencontré n'est jamais recalculé.
+    - La table des noeuds est bornée : au-delà de max_nodes noeuds (vérifié entre
+      deux pas), on ne garde que les noeuds atteignables depuis l'état courant
+      (ramasse-miettes) et les résultats mémorisés qui pointent vers eux.
+
+Conditions aux limites (paramètre boundary de HashLifeGrille) :
+    - "torus" (défaut) : le tore ny x nx du projet, comme Grille. On fait évoluer
+      le pavage périodique du plan par la grille, dans un carré de 2^K cellules
+      avec 2^(K-1) >= max(ny, nx) : après au plus 2^(K-2) générations, le carré
+      central est exact (vitesse de la lumière) et contient une période complète,
+      d'où l'on relit le tore. Chaque état du tore donne un pavage canonique :
+      une détection de cycle (Brent) sur ces noeuds permet de sauter directement
+      un nombre arbitraire de périodes (10^9 générations d'un motif périodique).
+    - "plane" : plan infini (Hashlife classique), le motif initial étant placé
+      aux coordonnées de la grille ; cells n'en montre que la fenêtre ny x nx,
+      ce qui sort de la fenêtre continue d'évoluer (planeurs d'un canon, ...).
+
+HashLifeGrille offre les attributs de Grille (dimensions, cells, col_life,
+col_dead, compute_next_iteration), donc s'affiche avec l'App de game_of_life_vect.py,
+et advance(n) pour avancer de n générations d'un coup.
+
+Usage : python game_of_life_hashlife.py [motif ...] [--generations 1000000000] [--boundary torus]
+"""
+import numpy as np
+
+LEAF_LEVEL = 3
+MAX_NODES = 500_000
+
+
+class Node:
+    __slots__ = ("level", "nw", "ne", "sw", "se", "bits", "population", "memo")
+
+    def __init__(self, level, nw=None, ne=None, sw=None, se=None, bits=0, population=0):
+        self.level = level
+        self.nw, self.ne, self.sw, self.se = nw, ne, sw, se
+        self.bits = bits
+        self.population = population
+        self.memo = None
+
+
+def leaf_array(bits):
+    return np.unpackbits(np.array([bits], dtype="<u8").view(np.uint8), bitorder="little").reshape(8, 8)
+
+
+def leaf_bits(arr):
+    return int(np.packbits(arr.ravel(), bitorder="little").view("<u8")[0])
+
+
+def evolve(a, generations):
+    """
+    generations pas de la règle B3/S23 sur le tableau a, entouré de cellules mortes.
+    """
+    for _ in range(generations):
+        p = np.pad(a, 1)
+        h, w = a.shape
+        n = sum(p[di:di + h, dj:dj + w] for di in range(3) for dj in range(3) if di != 1 or dj != 1)
+        a = ((n == 3) | ((a == 1) & (n == 2))).astype(np.uint8)
+    return a
+
+
+class HashLife:
+    """
+    Table des noeuds canoniques, avec leurs résultats mémorisés.
+    """
+    def __init__(self, max_nodes=MAX_NODES):
+        self.max_nodes = max_nodes
+        self.table = {}
+        self._empty = [None] * LEAF_LEVEL + [self.leaf(0)]
+
+    def __len__(self):
+        return len(self.table)
+
+    def leaf(self, bits):
+        node = self.table.get(bits)
+        if node is None:
+            node = self.table[bits] = Node(LEAF_LEVEL, bits=bits, population=bin(bits).count("1"))
+        return node
+
+    def join(self, nw, ne, sw, se):
+        key = (nw, ne, sw, se)
+        node = self.table.get(key)
+        if node is None:
+            node = self.table[key] = Node(nw.level + 1, nw, ne, sw, se,
+                                          population=nw.population + ne.population + sw.population + se.population)
+        return node
+
+    def empty(self, level):
+        while len(self._empty) <= level:
+            e = self._empty[-1]
+            self._empty.append(self.join(e, e, e, e))
+        return self._empty[level]
+
+    def array(self, node):
+        # Tableau complet d'un noeud de niveau 3 ou 4
+        if node.level == LEAF_LEVEL:
+            return leaf_array(node.bits)
+        return np.block([[leaf_array(node.nw.bits), leaf_array(node.ne.bits)],
+                         [leaf_array(node.sw.bits), leaf_array(node.se.bits)]])
+
+    def centre(self, node):
+        """
+        Carré central (niveau L-1) d'un noeud de niveau L >= 4.
+        """
+        if node.level == LEAF_LEVEL + 1:
+            return self.leaf(leaf_bits(self.array(node)[4:12, 4:12]))
+        return self.join(node.nw.se, node.ne.sw, node.sw.ne, node.se.nw)
+
+    def expand(self, node):
+        """
+        Noeud de niveau L+1 ayant node en son centre, entouré de cellules mortes.
+        """
+        e = self.empty(node.level - 1)
+        return self.join(self.join(e, e, e, node.nw), self.join(e, e, node.ne, e),
+                         self.join(e, node.sw, e, e), self.join(node.se, e, e, e))
+
+    def step(self, node, j):
+        """
+        Carré central (niveau L-1) du noeud de niveau L >= 4 après 2^j générations, 0 <= j <= L-2.
+        """
+        if node.memo is not None and j in node.memo:
+            return node.memo[j]
+        L = node.level
+        if node.population == 0:
+            result = self.empty(L - 1)
+        elif L == LEAF_LEVEL + 1:
+            result = self.leaf(leaf_bits(evolve(self.array(node), 1 << j)[4:12, 4:12]))
+        else:
+            nw, ne, sw, se = node.nw, node.ne, node.sw, node.se
+            # Neuf sous-carrés de niveau L-1 qui se chevauchent
+            nine = [nw, self.join(nw.ne, ne.nw, nw.se, ne.sw), ne,
+                    self.join(nw.sw, nw.se, sw.nw, sw.ne), self.join(nw.se, ne.sw, sw.ne, se.nw),
+                    self.join(ne.sw, ne.se, se.nw, se.ne),
+                    sw, self.join(sw.ne, se.nw, sw.se, se.sw), se]
+            if j == L - 2:
+                # Vitesse maximale : deux demi-pas de 2^(L-3) générations
+                a = [self.step(x, L - 3) for x in nine]
+                jj = L - 3
+            else:
+                a = [self.centre(x) for x in nine]
+                jj = j
+            result = self.join(self.step(self.join(a[0], a[1], a[3], a[4]), jj),
+                               self.step(self.join(a[1], a[2], a[4], a[5]), jj),
+                               self.step(self.join(a[3], a[4], a[6], a[7]), jj),
+                               self.step(self.join(a[4], a[5], a[7], a[8]), jj))
+        if node.memo is None:
+            node.memo = {}
+        node.memo[j] = result
+        return result
+
+    def from_array(self, arr):
+        """
+        Noeud canonique d'un tableau carré de 0/1 de côté 2^L (L >= 3).
+        """
+        n = arr.shape[0]
+        b = n // 8
+        blocks = np.ascontiguousarray(arr, dtype=np.uint8).reshape(b, 8, b, 8).transpose(0, 2, 1, 3).reshape(b * b, 64)
+        bits = np.packbits(blocks, axis=1, bitorder="little").view("<u8").ravel()
+        values, inverse = np.unique(bits, return_inverse=True)
+        leaves = np.array([self.leaf(int(v)) for v in values] + [None], dtype=object)[:-1]
+        grid = leaves[inverse.ravel()].reshape(b, b)
+        while grid.shape[0] > 1:
+            quads = zip(grid[0::2, 0::2].ravel(), grid[0::2, 1::2].ravel(),
+                        grid[1::2, 0::2].ravel(), grid[1::2, 1::2].ravel())
+            h = grid.shape[0] // 2
+            grid = np.array([self.join(*q) for q in quads] + [None], dtype=object)[:-1].reshape(h, h)
+        return grid[0, 0]
+
+    def to_array(self, node, y0, x0, h, w):
+        """
+        Cellules [y0:y0+h, x0:x0+w] du carré node (coordonnées relatives à son coin haut gauche).
+        """
+        out = np.zeros((h, w), dtype=np.uint8)
+        stack = [(node, 0, 0)]
+        while stack:
+            n, top, left = stack.pop()
+            size = 1 << n.level
+            if n.population == 0 or top >= y0 + h or left >= x0 + w or top + size <= y0 or left + size <= x0:
+                continue
+            if n.level == LEAF_LEVEL:
+                a = leaf_array(n.bits)
+                r0, r1 = max(top, y0), min(top + size, y0 + h)
+                c0, c1 = max(left, x0), min(left + size, x0 + w)
+                out[r0 - y0:r1 - y0, c0 - x0:c1 - x0] = a[r0 - top:r1 - top, c0 - left:c1 - left]
+            else:
+                half = size // 2
+                stack += [(n.nw, top, left), (n.ne, top, left + half),
+                          (n.sw, top + half, left), (n.se, top + half, left + half)]
+        return out
+
+    def collect(self, roots):
+        """
+        Ramasse-miettes : ne garde que les noeuds atteignables depuis roots (et les
+        noeuds vides), et les résultats mémorisés qui pointent vers des noeuds gardés.
+        """
+        keep = set()
+        stack = list(roots) + self._empty[LEAF_LEVEL:]
+        while stack:
+            n = stack.pop()
+            if n in keep:
+                continue
+            keep.add(n)
+            if n.level > LEAF_LEVEL:
+                stack += [n.nw, n.ne, n.sw, n.se]
+        self.table = {k: n for k, n in self.table.items() if n in keep}
+        for n in keep:
+            if n.memo is not None:
+                n.memo = {j: r for j, r in n.memo.items() if r in keep} or None
+
+    def maybe_collect(self, roots):
+        if len(self.table) > self.max_nodes:
+            self.collect(roots)
+
+
+class HashLifeGrille:
+    """
+    Grille de jeu de la vie calculée par Hashlife (voir l'en-tête du module).
+    Les paramètres sont ceux de Grille dans game_of_life_vect.py, plus boundary
+    ("torus" ou "plane") et max_nodes (borne de la table des noeuds).
+    """
+    def __init__(self, dim, init_pattern=None, color_life="black", color_dead="white",
+                 boundary="torus", max_nodes=MAX_NODES):
+        if boundary not in ("torus", "plane"):
+            raise ValueError(f"boundary doit valoir 'torus' ou 'plane', pas {boundary!r}")
+        if init_pattern is not None:
+            cells = np.zeros(dim, dtype=np.uint8)
+            cells[tuple(np.array(init_pattern, dtype=np.intp).reshape(-1, 2).T)] = 1
+        else:
+            cells = np.random.randint(2, size=dim, dtype=np.uint8)
+        self.dimensions = dim
+        self.col_life = color_life
+        self.col_dead = color_dead
+        self.boundary = boundary
+        self.generation = 0
+        self.hashlife = HashLife(max_nodes)
+        self._set_cells(cells)
+
+    @classmethod
+    def from_cells(cls, cells, boundary="torus", **kwargs):
+        grid = cls(cells.shape, init_pattern=[], boundary=boundary, **kwargs)
+        grid._set_cells(np.asarray(cells, dtype=np.uint8))
+        return grid
+
+    def _set_cells(self, cells):
+        ny, nx = self.dimensions
+        hl = self.hashlife
+        if self.boundary == "torus":
+            # Pavage de côté 2^K, le centre 2^(K-1) contenant une période du tore
+            self._K = max(LEAF_LEVEL + 2, int(max(ny, nx) - 1).bit_length() + 1)
+            self._root = self._tiling(cells)
+        else:
+            L = max(LEAF_LEVEL + 2, int(max(ny, nx) - 1).bit_length())
+            square = np.zeros((1 << L, 1 << L), dtype=np.uint8)
+            square[:ny, :nx] = cells
+            self._root = hl.from_array(square)
+            self._origin = 0   # coordonnée (ligne et colonne) du coin haut gauche de la racine
+        self._cells = cells
+
+    def _tiling(self, cells):
+        size = 1 << self._K
+        ny, nx = self.dimensions
+        return self.hashlife.from_array(np.tile(cells, (-(-size // ny), -(-size // nx)))[:size, :size])
+
+    @property
+    def cells(self):
+        # Sur le tore, les cellules sont relues à chaque pas (_torus_step)
+        if self._cells is None:
+            ny, nx = self.dimensions
+            self._cells = self.hashlife.to_array(self._root, -self._origin, -self._origin, ny, nx)
+        return self._cells
+
+    @property
+    def population(self):
+        if self.boundary == "torus":
+            return int(self.cells.sum())
+        return self._root.population
+
+    def _torus_step(self, j):
+        # Tore après 2^j générations : carré central du pavage, dont le coin haut gauche
+        # est la cellule (q mod ny, q mod nx) du tore, q = 2^(K-2)
+        ny, nx = self.dimensions
+        q = 1 << (self._K - 2)
+        centre = self.hashlife.to_array(self.hashlife.step(self._root, j), 0, 0, ny, nx)
+        self._cells = np.roll(centre, (q % ny, q % nx), axis=(0, 1))
+        self._root = self._tiling(self._cells)
+
+    def _plane_step(self, j):
+        hl = self.hashlife
+        root = self._root
+        # Le motif doit tenir dans le carré central du carré central, et 2^j <= 2^(L-3) :
+        # il reste alors dans le carré central renvoyé par step
+        while root.level < max(j + 3, LEAF_LEVEL + 2) or hl.centre(hl.centre(root)).population != root.population:
+            self._origin -= 1 << (root.level - 1)
+            root = hl.expand(root)
+        self._origin += 1 << (root.level - 2)
+        root = hl.step(root, j)
+        # On retire les bordures vides
+        while root.level > LEAF_LEVEL + 2 and hl.centre(root).population == root.population:
+            self._origin += 1 << (root.level - 2)
+            root = hl.centre(root)
+        self._root = root
+
+    def advance(self, generations):
+        """
+        Avance de generations générations.
+        """
+        hl = self.hashlife
+        step = self._torus_step if self.boundary == "torus" else self._plane_step
+        remaining = generations
+        if self.boundary == "torus":
+            # Pas de 2^(K-2) générations, avec détection de cycle de Brent sur les pavages
+            jmax = self._K - 2
+            macro, remaining = divmod(remaining, 1 << jmax)
+            checkpoint, power, lam = self._root, 1, 0
+            done = 0
+            while done < macro:
+                step(jmax)
+                done += 1
+                lam += 1
+                if checkpoint is not None and self._root is checkpoint:
+                    done += (macro - done) // lam * lam
+                    checkpoint = None
+                elif checkpoint is not None and lam == power:
+                    checkpoint, power, lam = self._root, 2 * power, 0
+                hl.maybe_collect([self._root] + ([checkpoint] if checkpoint is not None else []))
+        while remaining > 0:
+            j = remaining.bit_length() - 1
+            if self.boundary == "torus":
+                j = min(j, self._K - 2)
+            step(j)
+            remaining -= 1 << j
+            hl.maybe_collect([self._root])
+        self.generation += generations
+        if self.boundary == "plane":
+            self._cells = None
+
+    def compute_next_iteration(self):
+        """
+        Calcule la génération suivante ; renvoie les indices plats (i*nx+j) des cellules modifiées.
+        """
+        old = self.cells
+        self.advance(1)
+        return np.flatnonzero(old != self.cells)
+
+
+if __name__ == '__main__':
+    import argparse
+    import time
+    from game_of_life_vect import dico_patterns
+    from game_of_life_bits import BitGrille
+
+    parser = argparse.ArgumentParser(description="Jeu de la vie par Hashlife")
+    parser.add_argument("patterns", nargs="*", default=["glider_gun", "block_switch_engine", "u"])
+    parser.add_argument("--generations", type=int, default=10**9)
+    parser.add_argument("--boundary", choices=("torus", "plane"), default="torus")
+    parser.add_argument("--max-nodes", type=int, default=MAX_NODES)
+    parser.add_argument("--check", type=int, default=0, metavar="N",
+                        help="compare d'abord N générations (tore) avec game_of_life_bits.py")
+    args = parser.parse_args()
+
+    for name in args.patterns:
+        dim, pattern = dico_patterns[name]
+        if args.check:
+            ref = BitGrille(dim, pattern)
+            grid = HashLifeGrille(dim, pattern, boundary="torus", max_nodes=args.max_nodes)
+            for g in range(args.check):
+                ref.step()
+                grid.advance(1)
+                assert np.array_equal(grid.cells, ref.cells), (name, g)
+            ref = BitGrille(dim, pattern)
+            for g in range(args.check):
+                ref.step()
+            grid = HashLifeGrille(dim, pattern, boundary="torus", max_nodes=args.max_nodes)
+            grid.advance(args.check)
+            assert np.array_equal(grid.cells, ref.cells), name
+            print(f"{name}: {args.check} générations identiques à game_of_life_bits.py")
+        grid = HashLifeGrille(dim, pattern, boundary=args.boundary, max_nodes=args.max_nodes)
+        t0 = time.time()
+        grid.advance(args.generations)
+        elapsed = time.time() - t0
+        print(f"{name} ({args.boundary}, {dim[0]}x{dim[1]}) : {args.generations} générations en {elapsed:.3f}s, "
+              f"population {grid.population}, {len(grid.hashlife)} noeuds")
@@ -68,12 +68,18 @@ class LocalGrille:
 
 class App:
     #on affiche sur rang 0 uniquement, rang 1 lui envoie la grille globale
+    #seules les cellules modifiées depuis l'image précédente sont repeintes (voir App dans game_of_life_vect.py)
+
+    # Au-delà de cette proportion de cellules modifiées, on repeint toute l'image
+    FULL_FRAME_FRACTION = 0.05
 
     def __init__(self, geometry, global_cells,
                  color_life=pg.Color("black"), color_dead=pg.Color("white")):
         self.col_life = color_life
         self.col_dead = color_dead
         self.global_cells = global_cells
+        self.diff = None
+        self.drawn = False
 
         ny, nx = global_cells.shape
 
@@ -94,7 +100,25 @@ class App:
         # Créer fenêtre
         self.screen = pg.display.set_mode((self.width, self.height))
 
+        # Couleurs (morte, vivante) en RGB pour surfarray
+        self.palette = np.array([tuple(pg.Color(color_dead))[:3], tuple(pg.Color(color_life))[:3]], dtype=np.uint8)
+
+        # Lignes de la grille, dessinées une seule fois
+        self.overlay = None
+        if self.draw_color is not None:
+            self.overlay = pg.Surface((self.width, self.height), pg.SRCALPHA)
+            [pg.draw.line(self.overlay, self.draw_color,
+                          (0, i * self.size_y),
+                          (self.width, i * self.size_y))
+             for i in range(ny)]
+            [pg.draw.line(self.overlay, self.draw_color,
+                          (j * self.size_x, 0),
+                          (j * self.size_x, self.height))
+             for j in range(nx)]
+
     def update_cells(self, new_global_cells: np.ndarray):
+        # Cellules modifiées depuis la dernière image affichée
+        self.diff = np.flatnonzero(new_global_cells != self.global_cells) if self.drawn else None
         self.global_cells = new_global_cells
 
     def compute_rectangle(self, i: int, j: int):
@@ -112,21 +136,26 @@ class App:
     def draw(self):
         ny, nx = self.global_cells.shape
 
-        [self.screen.fill(self.compute_color(i, j), self.compute_rectangle(i, j))
-         for i in range(ny)
-         for j in range(nx)]
-
-        if self.draw_color is not None:
-            [pg.draw.line(self.screen, self.draw_color,
-                          (0, i * self.size_y),
-                          (self.width, i * self.size_y))
-             for i in range(ny)]
-            [pg.draw.line(self.screen, self.draw_color,
-                          (j * self.size_x, 0),
-                          (j * self.size_x, self.height))
-             for j in range(nx)]
-
-        pg.display.update()
+        if self.diff is None or len(self.diff) > self.FULL_FRAME_FRACTION * ny * nx:
+            # Image complète : un pixel par cellule (ligne 0 en bas), agrandie en un seul blit
+            pixels = self.palette[self.global_cells.T[:, ::-1]]
+            surface = pg.transform.scale(pg.surfarray.make_surface(pixels), (self.width, self.height))
+            self.screen.blit(surface, (0, 0))
+            if self.overlay is not None:
+                self.screen.blit(self.overlay, (0, 0))
+            pg.display.update()
+            self.drawn = True
+            return
+
+        rects = []
+        for k in self.diff.tolist():
+            i, j = divmod(k, nx)
+            rect = pg.Rect(self.compute_rectangle(i, j))
+            self.screen.fill(self.compute_color(i, j), rect)
+            if self.overlay is not None:
+                self.screen.blit(self.overlay, rect, area=rect)
+            rects.append(rect)
+        pg.display.update(rects)
 
 
 def main():
@@ -38,55 +38,107 @@ class Grille:
     Exemple :
        grid = Grille( (10,10), init_pattern=[(2,2),(0,2),(4,2),(2,0),(2,4)], color_life=pg.Color("red"), color_dead=pg.Color("black"))
     """
+    TILE = 32
+    # Au-delà de cette proportion de tuiles actives, on recalcule toute la grille d'un coup
+    DENSE_FRACTION = 0.5
+
     def __init__(self, dim, init_pattern=None, color_life=pg.Color("black"), color_dead=pg.Color("white")):
         import random
         self.dimensions = dim
+        # Deux tableaux avec une bordure d'une cellule (copie des bords opposés du tore) :
+        # self.cells est l'intérieur de l'un, la génération suivante est écrite dans l'autre
+        self._buffers = [np.zeros((dim[0] + 2, dim[1] + 2), dtype=np.uint8) for _ in range(2)]
+        self._current = 0
+        self.cells = self._buffers[0][1:-1, 1:-1]
         if init_pattern is not None:
-            self.cells = np.zeros(self.dimensions, dtype=np.uint8) #uint8
             indices_i = [v[0] for v in init_pattern]
             indices_j = [v[1] for v in init_pattern]
             self.cells[indices_i,indices_j] = 1
         else:
-            self.cells = np.random.randint(2, size=dim, dtype=np.uint8)
+            self.cells[...] = np.random.randint(2, size=dim, dtype=np.uint8)
         self.col_life = color_life
         self.col_dead = color_dead
-    
-    @staticmethod        
-    def h(x):
-        x[x<=1]=-1
-        x[x>=4]=-1
-        x[x==2]=0
-        x[x==3]=1
-
-    
+        self._voisins = np.empty(dim, dtype=np.uint8)
+        # Tuiles TILE x TILE : seules les tuiles modifiées à la génération précédente et leurs
+        # voisines sont recalculées (les autres ne peuvent pas changer)
+        self._tile_rows = np.arange(0, dim[0], Grille.TILE)
+        self._tile_cols = np.arange(0, dim[1], Grille.TILE)
+        self.reset_active_tiles()
+
+    def reset_active_tiles(self):
+        """
+        Marque toutes les tuiles comme actives (à appeler si self.cells est modifié de l'extérieur).
+        """
+        self._active = np.ones((len(self._tile_rows), len(self._tile_cols)), dtype=bool)
+
+    @staticmethod
+    def stencil(P, i0, i1, j0, j1, voisins, out):
+        """
+        Écrit dans out la génération suivante des cellules [i0:i1, j0:j1], à partir de la
+        grille avec bordure P (cellule (i,j) en P[i+1,j+1]) ; voisins : tampon uint8 de même forme.
+        """
+        h, w = i1 - i0, j1 - j0
+        # Somme des huit voisines : vues décalées de la grille avec bordure
+        np.add(P[i0:i0 + h, j0:j0 + w], P[i0:i0 + h, j0 + 1:j0 + 1 + w], out=voisins)
+        for di, dj in ((0, 2), (1, 0), (1, 2), (2, 0), (2, 1), (2, 2)):
+            np.add(voisins, P[i0 + di:i0 + di + h, j0 + dj:j0 + dj + w], out=voisins)
+        # Règle B3/S23 sur le code 2*voisines + état (0..17) : la cellule vit ssi il vaut
+        # 5 (2 voisines, vivante), 6 ou 7 (3 voisines), soit (code - 5) mod 256 < 3.
+        # C'est la table de la règle réduite à un intervalle, sans tableau d'indices
+        # intermédiaire (np.take convertirait les codes en entiers 64 bits).
+        np.left_shift(voisins, 1, out=voisins)
+        np.bitwise_or(voisins, P[i0 + 1:i1 + 1, j0 + 1:j1 + 1], out=voisins)
+        np.subtract(voisins, 5, out=voisins)
+        np.less(voisins, 3, out=out)
+
     def compute_next_iteration(self):
         """
         Calcule la prochaine génération de cellules en suivant les règles du jeu de la vie
         """
-        # Remarque 1: on pourrait optimiser en faisant du vectoriel, mais pour plus de clarté, on utilise les boucles
-        # Remarque 2: on voit la grille plus comme une matrice qu'une grille géométrique. L'indice (0,0) est donc en haut
-        #             à gauche de la grille !
-        ny = self.dimensions[0]
-        nx = self.dimensions[1]
-        next_cells = np.zeros(self.dimensions, dtype=np.uint8)
-        diff_cells = []
-        # Convolution de base 2.
-        from scipy.signal import convolve2d
-        C = np.ones((3,3))
-        C[1,1]=0
-        voisins = convolve2d(self.cells, C, mode='same', boundary='wrap') # si on met boundary en commentaire on a pas la propriété de tor
-        Grille.h(voisins)
-        # Point de vue continue
-        temp = self.cells + voisins
-        next_cells = np.clip(temp, 0, 1)          
-
-        # Point de vue discontinue
-        #next_cells[voisins == 3] = 1 # les cellules entourés de 3 cellules vivantes sont vivantes 
-        #print(f"next cells 1 : {next_cells}")
-        #next_cells[(self.cells == 1) & (voisins == 2)] = 1 # les cellules entourés de deux restent vivantes
-        #print(f"next cells 2 : {next_cells}")
-
-       
+        # Remarque : on voit la grille plus comme une matrice qu'une grille géométrique. L'indice (0,0) est donc en haut
+        #            à gauche de la grille !
+        # Renvoie les indices plats (i*nx+j) des cellules modifiées, dans un ordre quelconque.
+        # Les deux tampons alternent : une tuile inactive n'a pas changé à la génération
+        # précédente, donc l'autre tampon contient déjà son état et il n'y a rien à écrire.
+        ny, nx = self.dimensions
+        T = Grille.TILE
+        P = self._buffers[self._current]
+        # Bordure torique : lignes puis colonnes (les coins suivent)
+        P[0, 1:-1] = P[-2, 1:-1]
+        P[-1, 1:-1] = P[1, 1:-1]
+        P[:, 0] = P[:, -2]
+        P[:, -1] = P[:, 1]
+        self._current = 1 - self._current
+        next_cells = self._buffers[self._current][1:-1, 1:-1]
+
+        if self._active.mean() > Grille.DENSE_FRACTION:
+            Grille.stencil(P, 0, ny, 0, nx, self._voisins, next_cells)
+            changed = next_cells != self.cells
+            diff_cells = np.flatnonzero(changed)
+            tiles_changed = np.logical_or.reduceat(np.logical_or.reduceat(changed, self._tile_rows, axis=0),
+                                                   self._tile_cols, axis=1)
+        else:
+            # Suites de tuiles actives consécutives d'une même rangée : un seul calcul par suite
+            tiles_changed = np.zeros_like(self._active)
+            parts = []
+            edges = np.diff(self._active.astype(np.int8), axis=1, prepend=0, append=0)
+            for (ti, tj0), (_, tj1) in zip(np.argwhere(edges == 1), np.argwhere(edges == -1)):
+                i0, j0 = ti * T, tj0 * T
+                i1, j1 = min(i0 + T, ny), min(tj1 * T, nx)
+                out = next_cells[i0:i1, j0:j1]
+                Grille.stencil(P, i0, i1, j0, j1, self._voisins[:i1 - i0, :j1 - j0], out)
+                changed = out != self.cells[i0:i1, j0:j1]
+                tiles_changed[ti, tj0:tj1] = np.logical_or.reduceat(changed.any(axis=0), np.arange(0, j1 - j0, T))
+                li, lj = np.divmod(np.flatnonzero(changed), j1 - j0)
+                parts.append((li + i0) * nx + lj + j0)
+            diff_cells = np.concatenate(parts) if parts else np.empty(0, dtype=np.intp)
+
+        # Tuiles actives à la génération suivante : tuiles modifiées et leurs voisines (tore)
+        self._active = tiles_changed.copy()
+        for di in (-1, 0, 1):
+            for dj in (-1, 0, 1):
+                if di or dj:
+                    self._active |= np.roll(tiles_changed, (di, dj), axis=(0, 1))
         self.cells = next_cells
         return diff_cells
 
@@ -96,7 +148,13 @@ class App:
     Cette classe décrit la fenêtre affichant la grille à l'écran
         - geometry est un tuple de deux entiers donnant le nombre de pixels verticaux et horizontaux (dans cet ordre)
         - grid est la grille décrivant l'automate cellulaire (voir plus haut)
+    draw(diff) ne repeint que les cellules modifiées (indices plats renvoyés par
+    compute_next_iteration) ; sans diff, ou s'il y en a trop, toute l'image est
+    construite d'un coup par pygame.surfarray puis agrandie et copiée à l'écran.
     """
+    # Au-delà de cette proportion de cellules modifiées, on repeint toute l'image
+    FULL_FRAME_FRACTION = 0.05
+
     def __init__(self, geometry, grid):
         self.grid = grid
         # Calcul de la taille d'une cellule par rapport à la taille de la fenêtre et de la grille à afficher :
@@ -111,8 +169,15 @@ class App:
         self.height= grid.dimensions[0] * self.size_y
         # Création de la fenêtre à l'aide de tkinter
         self.screen = pg.display.set_mode((self.width,self.height))
-        #
-        self.canvas_cells = []
+        # Couleurs (morte, vivante) en RGB pour surfarray
+        self.palette = np.array([tuple(pg.Color(grid.col_dead))[:3], tuple(pg.Color(grid.col_life))[:3]], dtype=np.uint8)
+        # Lignes de la grille dessinées une fois pour toutes sur une surface transparente
+        self.overlay = None
+        if self.draw_color is not None:
+            self.overlay = pg.Surface((self.width, self.height), pg.SRCALPHA)
+            [pg.draw.line(self.overlay, self.draw_color, (0,i*self.size_y), (self.width,i*self.size_y)) for i in range(grid.dimensions[0])]
+            [pg.draw.line(self.overlay, self.draw_color, (j*self.size_x,0), (j*self.size_x,self.height)) for j in range(grid.dimensions[1])]
+        self.drawn = False
 
     def compute_rectangle(self, i: int, j: int):
         """
@@ -126,12 +191,51 @@ class App:
         else:
             return self.grid.col_life
 
-    def draw(self):
-        [self.screen.fill(self.compute_color(i,j),self.compute_rectangle(i,j)) for i in range(self.grid.dimensions[0]) for j in range(self.grid.dimensions[1])]
-        if (self.draw_color is not None):
-            [pg.draw.line(self.screen, self.draw_color, (0,i*self.size_y), (self.width,i*self.size_y)) for i in range(self.grid.dimensions[0])]
-            [pg.draw.line(self.screen, self.draw_color, (j*self.size_x,0), (j*self.size_x,self.height)) for j in range(self.grid.dimensions[1])]
+    def draw_full(self):
+        """
+        Image complète : une surface d'un pixel par cellule (axes x, y de surfarray, ligne 0 en bas)
+        agrandie à la taille de la fenêtre, puis les lignes de la grille.
+        """
+        pixels = self.palette[self.grid.cells.T[:, ::-1]]
+        surface = pg.transform.scale(pg.surfarray.make_surface(pixels), (self.width, self.height))
+        self.screen.blit(surface, (0, 0))
+        if self.overlay is not None:
+            self.screen.blit(self.overlay, (0, 0))
         pg.display.update()
+        self.drawn = True
+
+    def draw(self, diff=None):
+        if diff is None or not self.drawn or len(diff) > self.FULL_FRAME_FRACTION * self.grid.cells.size:
+            self.draw_full()
+            return
+        nx = self.grid.dimensions[1]
+        rects = []
+        for k in diff.tolist():
+            i, j = divmod(k, nx)
+            rect = pg.Rect(self.compute_rectangle(i, j))
+            self.screen.fill(self.compute_color(i, j), rect)
+            if self.overlay is not None:
+                self.screen.blit(self.overlay, rect, area=rect)
+            rects.append(rect)
+        pg.display.update(rects)
+
+
+dico_patterns = { # Dimension et pattern dans un tuple
+    'blinker' : ((5,5),[(2,1),(2,2),(2,3)]),
+    'toad'    : ((6,6),[(2,2),(2,3),(2,4),(3,3),(3,4),(3,5)]),
+    "acorn"   : ((100,100), [(51,52),(52,54),(53,51),(53,52),(53,55),(53,56),(53,57)]),
+    "beacon"  : ((6,6), [(1,3),(1,4),(2,3),(2,4),(3,1),(3,2),(4,1),(4,2)]),
+    "boat" : ((5,5),[(1,1),(1,2),(2,1),(2,3),(3,2)]),
+    "glider": ((100,90),[(1,1),(2,2),(2,3),(3,1),(3,2)]),
+    "glider_gun": ((400,400),[(51,76),(52,74),(52,76),(53,64),(53,65),(53,72),(53,73),(53,86),(53,87),(54,63),(54,67),(54,72),(54,73),(54,86),(54,87),(55,52),(55,53),(55,62),(55,68),(55,72),(55,73),(56,52),(56,53),(56,62),(56,66),(56,68),(56,69),(56,74),(56,76),(57,62),(57,68),(57,76),(58,63),(58,67),(59,64),(59,65)]),
+    "space_ship": ((25,25),[(11,13),(11,14),(12,11),(12,12),(12,14),(12,15),(13,11),(13,12),(13,13),(13,14),(14,12),(14,13)]),
+    "die_hard" : ((100,100), [(51,57),(52,51),(52,52),(53,52),(53,56),(53,57),(53,58)]),
+    "pulsar": ((17,17),[(2,4),(2,5),(2,6),(7,4),(7,5),(7,6),(9,4),(9,5),(9,6),(14,4),(14,5),(14,6),(2,10),(2,11),(2,12),(7,10),(7,11),(7,12),(9,10),(9,11),(9,12),(14,10),(14,11),(14,12),(4,2),(5,2),(6,2),(4,7),(5,7),(6,7),(4,9),(5,9),(6,9),(4,14),(5,14),(6,14),(10,2),(11,2),(12,2),(10,7),(11,7),(12,7),(10,9),(11,9),(12,9),(10,14),(11,14),(12,14)]),
+    "floraison" : ((40,40), [(19,18),(19,19),(19,20),(20,17),(20,19),(20,21),(21,18),(21,19),(21,20)]),
+    "block_switch_engine" : ((400,400), [(201,202),(201,203),(202,202),(202,203),(211,203),(212,204),(212,202),(214,204),(214,201),(215,201),(215,202),(216,201)]),
+    "u" : ((200,200), [(101,101),(102,102),(103,102),(103,101),(104,103),(105,103),(105,102),(105,101),(105,105),(103,105),(102,105),(101,105),(101,104)]),
+    "flat" : ((200,400), [(80,200),(81,200),(82,200),(83,200),(84,200),(85,200),(86,200),(87,200), (89,200),(90,200),(91,200),(92,200),(93,200),(97,200),(98,200),(99,200),(106,200),(107,200),(108,200),(109,200),(110,200),(111,200),(112,200),(114,200),(115,200),(116,200),(117,200),(118,200)])
+}
 
 
 if __name__ == '__main__':
@@ -139,22 +243,6 @@ if __name__ == '__main__':
     import sys
 
     pg.init()
-    dico_patterns = { # Dimension et pattern dans un tuple
-        'blinker' : ((5,5),[(2,1),(2,2),(2,3)]),
-        'toad'    : ((6,6),[(2,2),(2,3),(2,4),(3,3),(3,4),(3,5)]),
-        "acorn"   : ((100,100), [(51,52),(52,54),(53,51),(53,52),(53,55),(53,56),(53,57)]),
-        "beacon"  : ((6,6), [(1,3),(1,4),(2,3),(2,4),(3,1),(3,2),(4,1),(4,2)]),
-        "boat" : ((5,5),[(1,1),(1,2),(2,1),(2,3),(3,2)]),
-        "glider": ((100,90),[(1,1),(2,2),(2,3),(3,1),(3,2)]),
-        "glider_gun": ((400,400),[(51,76),(52,74),(52,76),(53,64),(53,65),(53,72),(53,73),(53,86),(53,87),(54,63),(54,67),(54,72),(54,73),(54,86),(54,87),(55,52),(55,53),(55,62),(55,68),(55,72),(55,73),(56,52),(56,53),(56,62),(56,66),(56,68),(56,69),(56,74),(56,76),(57,62),(57,68),(57,76),(58,63),(58,67),(59,64),(59,65)]),
-        "space_ship": ((25,25),[(11,13),(11,14),(12,11),(12,12),(12,14),(12,15),(13,11),(13,12),(13,13),(13,14),(14,12),(14,13)]),
-        "die_hard" : ((100,100), [(51,57),(52,51),(52,52),(53,52),(53,56),(53,57),(53,58)]),
-        "pulsar": ((17,17),[(2,4),(2,5),(2,6),(7,4),(7,5),(7,6),(9,4),(9,5),(9,6),(14,4),(14,5),(14,6),(2,10),(2,11),(2,12),(7,10),(7,11),(7,12),(9,10),(9,11),(9,12),(14,10),(14,11),(14,12),(4,2),(5,2),(6,2),(4,7),(5,7),(6,7),(4,9),(5,9),(6,9),(4,14),(5,14),(6,14),(10,2),(11,2),(12,2),(10,7),(11,7),(12,7),(10,9),(11,9),(12,9),(10,14),(11,14),(12,14)]),
-        "floraison" : ((40,40), [(19,18),(19,19),(19,20),(20,17),(20,19),(20,21),(21,18),(21,19),(21,20)]),
-        "block_switch_engine" : ((400,400), [(201,202),(201,203),(202,202),(202,203),(211,203),(212,204),(212,202),(214,204),(214,201),(215,201),(215,202),(216,201)]),
-        "u" : ((200,200), [(101,101),(102,102),(103,102),(103,101),(104,103),(105,103),(105,102),(105,101),(105,105),(103,105),(102,105),(101,105),(101,104)]),
-        "flat" : ((200,400), [(80,200),(81,200),(82,200),(83,200),(84,200),(85,200),(86,200),(87,200), (89,200),(90,200),(91,200),(92,200),(93,200),(97,200),(98,200),(99,200),(106,200),(107,200),(108,200),(109,200),(110,200),(111,200),(112,200),(114,200),(115,200),(116,200),(117,200),(118,200)])
-    }
     choice = 'glider'
     if len(sys.argv) > 1 :
         choice = sys.argv[1]
@@ -179,7 +267,7 @@ if __name__ == '__main__':
         diff = grid.compute_next_iteration()
         t2 = time.time()
         #time.sleep(500) # A régler ou commenter pour vitesse maxi
-        appli.draw()
+        appli.draw(diff)
         t3 = time.time()
         for event in pg.event.get():
             if event.type == pg.QUIT: